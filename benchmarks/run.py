@@ -0,0 +1,184 @@
+"""Offline benchmark: crawls synthetic blogs served locally, measures throughput of every stage and peak memory,
+compares results with stored baseline.
+
+    python -m benchmarks.run --posts 20 --images 2 --comments 50
+    python -m benchmarks.run --save-baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import BaseModel
+
+from benchmarks.synthetic_blog import SyntheticBlogModel, SyntheticBlogServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# engine name in blog2epub and style of synthetic blog it is measured with
+ENGINES = {
+    "default": "wordpress",
+    "blogger": "blogger",
+    "wordpress": "wordpress",
+}
+
+# for these results lower is better, for all the others higher is better
+LOWER_IS_BETTER = {"peak_memory_mb"}
+
+
+class BenchmarkResultModel(BaseModel):
+    articles: int = 0
+    images: int = 0
+    crawl_articles_per_s: float = 0.0
+    parse_articles_per_s: float = 0.0
+    images_mb_per_s: float = 0.0
+    epub_mb_per_s: float = 0.0
+    peak_memory_mb: float = 0.0
+
+
+class BaselineModel(BaseModel):
+    blog: SyntheticBlogModel
+    results: dict[str, BenchmarkResultModel]
+
+
+def _get_peak_memory_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _per_second(amount: float, ms: float) -> float:
+    return round(amount / (ms / 1000), 3) if ms else 0.0
+
+
+def run_engine(url: str, engine: str, work_dir: str) -> BenchmarkResultModel:
+    """Runs in separate process, so peak memory of one engine doesn't hide another."""
+    from blog2epub.blog2epub_main import Blog2Epub
+    from blog2epub.common.book import Book
+    from blog2epub.common.downloader import Downloader
+    from blog2epub.common.interfaces import EmptyInterface
+    from blog2epub.common.metrics import Metrics
+    from blog2epub.models.configuration import ConfigurationModel
+
+    class QuietInterface(EmptyInterface):
+        def print(self, text: str, end: str = "\n"):
+            pass
+
+        def delete_line(self):
+            pass
+
+    # local server doesn't need to be spared, and the pause would hide everything else
+    Downloader.image_download_delay = 0
+    interface = QuietInterface(metrics=Metrics())
+    configuration = ConfigurationModel(url=url, limit="", engine=engine, destination_folder=work_dir)
+    blog2epub = Blog2Epub(url=url, configuration=configuration, interface=interface, cache_folder=work_dir)
+    start = time.perf_counter()
+    blog2epub.download()
+    crawl_ms = (time.perf_counter() - start) * 1000
+    Book(
+        book_data=blog2epub.crawler.get_book_data(),
+        configuration=configuration,
+        interface=interface,
+        destination_folder=work_dir,
+    ).save()
+    counters = interface.metrics.get_counters()
+    articles = len(blog2epub.crawler.articles)
+    return BenchmarkResultModel(
+        articles=articles,
+        images=int(counters.get("image_processed.count", 0)),
+        crawl_articles_per_s=_per_second(articles, crawl_ms),
+        parse_articles_per_s=_per_second(counters.get("article_parsed.count", 0), counters.get("article_parsed.ms", 0)),
+        images_mb_per_s=_per_second(
+            counters.get("image_processed.bytes_in", 0) / 1024 / 1024, counters.get("image_processed.ms", 0)
+        ),
+        epub_mb_per_s=_per_second(
+            counters.get("book_written.bytes", 0) / 1024 / 1024, counters.get("book_written.ms", 0)
+        ),
+        peak_memory_mb=round(_get_peak_memory_mb(), 1),
+    )
+
+
+def run_benchmarks(blog: SyntheticBlogModel, engines: list[str]) -> dict[str, BenchmarkResultModel]:
+    results = {}
+    for engine in engines:
+        with (
+            SyntheticBlogServer(blog.model_copy(update={"style": ENGINES[engine]})) as server,
+            tempfile.TemporaryDirectory(prefix="blog2epub_benchmark_") as work_dir,
+            ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor,
+        ):
+            results[engine] = executor.submit(run_engine, server.url, engine, work_dir).result()
+    return results
+
+
+def compare(
+    results: dict[str, BenchmarkResultModel], baseline: BaselineModel, tolerance: float
+) -> tuple[list[str], bool]:
+    """Returns report lines and whether any result is worse than baseline by more than tolerance."""
+    lines = []
+    regression = False
+    for engine, result in results.items():
+        lines.append(f"{engine}: {result.articles} articles, {result.images} images")
+        baseline_result = baseline.results.get(engine)
+        for name, value in result.model_dump().items():
+            if name in ("articles", "images"):
+                continue
+            line = f"  {name}: {value}"
+            if baseline_result is not None:
+                baseline_value = getattr(baseline_result, name)
+                if baseline_value:
+                    change = (value - baseline_value) / baseline_value
+                    worse = change > tolerance if name in LOWER_IS_BETTER else change < -tolerance
+                    regression = regression or worse
+                    line += f" (baseline {baseline_value}, {change:+.0%}{', REGRESSION' if worse else ''})"
+            lines.append(line)
+    return lines, regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline blog2epub benchmark with local synthetic blogs.")
+    parser.add_argument("--posts", type=int, default=20, help="posts in synthetic blog")
+    parser.add_argument("--images", type=int, default=2, help="images per post")
+    parser.add_argument("--image-size", type=int, nargs=2, default=[1024, 768], help="images width and height")
+    parser.add_argument("--comments", type=int, default=10, help="comments per post")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="JSON file with baseline results")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative change against baseline")
+    args = parser.parse_args()
+    blog = SyntheticBlogModel(
+        posts=args.posts,
+        images_per_post=args.images,
+        image_size=tuple(args.image_size),
+        comments=args.comments,
+    )
+    results = run_benchmarks(blog, args.engines)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(BaselineModel(blog=blog, results=results).model_dump_json(indent=2))
+        print(f"Baseline saved: {args.baseline}")
+    baseline = BaselineModel(blog=blog, results={})
+    if os.path.isfile(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = BaselineModel.model_validate(json.load(f))
+        if baseline.blog != blog:
+            print("Synthetic blog differs from the one used for baseline, results are not compared.")
+            baseline = BaselineModel(blog=blog, results={})
+    lines, regression = compare(results, baseline, args.tolerance)
+    print("\n".join(lines))
+    sys.exit(1 if regression else 0)
+
+
+if __name__ == "__main__":
+    main()
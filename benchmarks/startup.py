@@ -0,0 +1,85 @@
+"""Startup time benchmark: how long CLI takes to print --help, compared with stored baseline.
+
+python -m benchmarks.startup
+python -m benchmarks.startup --save-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from pydantic import BaseModel
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+
+COMMANDS = {
+    "python": [sys.executable, "-c", "pass"],
+    "import_blog2epub": [sys.executable, "-c", "import blog2epub"],
+    "cli_help": [sys.executable, "-m", "blog2epub.blog2epub_cli", "--help"],
+    "batch_help": [sys.executable, "-m", "blog2epub.blog2epub_cli", "batch", "--help"],
+}
+
+
+class StartupResultModel(BaseModel):
+    median_ms: float
+    min_ms: float
+    # above bare interpreter startup, which doesn't depend on blog2epub
+    own_ms: float = 0.0
+
+
+def measure(command: list[str], runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run_benchmarks(runs: int) -> dict[str, StartupResultModel]:
+    results = {}
+    for name, command in COMMANDS.items():
+        timings = measure(command, runs)
+        results[name] = StartupResultModel(
+            median_ms=round(statistics.median(timings), 1), min_ms=round(min(timings), 1)
+        )
+    for result in results.values():
+        result.own_ms = round(max(0.0, result.median_ms - results["python"].median_ms), 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of blog2epub CLI.")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="number of runs of every command")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="JSON file with baseline results")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative change against baseline")
+    parser.add_argument("--margin-ms", type=float, default=20, help="changes smaller than this are never reported")
+    args = parser.parse_args()
+    results = run_benchmarks(args.runs)
+    baseline: dict[str, StartupResultModel] = {}
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({name: result.model_dump() for name, result in results.items()}, f, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+    elif os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = {name: StartupResultModel.model_validate(result) for name, result in json.load(f).items()}
+    regression = False
+    for name, result in results.items():
+        line = f"{name}: {result.median_ms} ms (min {result.min_ms} ms, {result.own_ms} ms above bare python)"
+        if name in baseline and name != "python":
+            change = result.own_ms - baseline[name].own_ms
+            worse = change > args.margin_ms and change > baseline[name].own_ms * args.tolerance
+            regression = regression or worse
+            line += f" (baseline {baseline[name].own_ms} ms, {change:+.1f} ms{', REGRESSION' if worse else ''})"
+        print(line)
+    sys.exit(1 if regression else 0)
+
+
+if __name__ == "__main__":
+    main()
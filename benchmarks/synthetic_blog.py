@@ -0,0 +1,209 @@
+import io
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Literal
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from PIL import Image
+from pydantic import BaseModel
+
+SITEMAP_PAGE_SIZE = 50
+
+
+class SyntheticBlogModel(BaseModel):
+    style: Literal["blogger", "wordpress"] = "blogger"
+    posts: int = 20
+    images_per_post: int = 2
+    image_size: tuple[int, int] = (1024, 768)
+    comments: int = 10
+
+
+class SyntheticBlog:
+    """Deterministic Blogger-style or WordPress-style blog: robots.txt, sitemaps, posts with images
+    and comments. Content is generated up front, so serving it costs (almost) nothing."""
+
+    def __init__(self, blog: SyntheticBlogModel, base_url: str = ""):
+        self.blog = blog
+        self.base_url = base_url
+        self.start_date = datetime(2020, 1, 1, 12, 0)
+        self.posts_paths = {self.get_post_path(post): post for post in range(self.blog.posts)}
+        self.images: dict[str, bytes] = {}
+        for post in range(self.blog.posts):
+            for image in range(self.blog.images_per_post):
+                self.images[f"/images/{post}_{image}.jpg"] = self._get_image(post * 1000 + image)
+
+    def _get_image(self, seed: int) -> bytes:
+        width, height = self.blog.image_size
+        random = np.random.default_rng(seed)
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        noise = random.normal(0, 24, (height, width, 3)).astype(np.float32)
+        colour = random.uniform(0.3, 1.0, 3).astype(np.float32)
+        pixels = np.clip(gradient * colour + noise, 0, 255).astype(np.uint8)
+        output = io.BytesIO()
+        Image.fromarray(pixels, "RGB").save(output, format="JPEG", quality=90)
+        return output.getvalue()
+
+    def get_post_date(self, post: int) -> datetime:
+        return self.start_date + timedelta(days=post * 3)
+
+    def get_post_path(self, post: int) -> str:
+        post_date = self.get_post_date(post)
+        if self.blog.style == "blogger":
+            return f"/{post_date:%Y}/{post_date:%m}/post-{post}.html"
+        return f"/{post_date:%Y}/{post_date:%m}/post-{post}/"
+
+    def get_robots(self) -> str:
+        sitemap = "/sitemap.xml" if self.blog.style == "blogger" else "/wp-sitemap.xml"
+        return f"User-agent: *\nAllow: /\n\nSitemap: {self.base_url}{sitemap}\n"
+
+    @staticmethod
+    def _get_urlset(urls: list[str]) -> str:
+        entries = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            + f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+        )
+
+    @staticmethod
+    def _get_sitemap_index(urls: list[str]) -> str:
+        entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            + f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+        )
+
+    def get_sitemap(self, path: str, page: int | None) -> str | None:
+        pages_count = (self.blog.posts + SITEMAP_PAGE_SIZE - 1) // SITEMAP_PAGE_SIZE
+        if self.blog.style == "blogger" and path == "/sitemap.xml":
+            if page is None:
+                return self._get_sitemap_index(
+                    [f"{self.base_url}/sitemap.xml?page={number}" for number in range(1, pages_count + 1)]
+                )
+        elif self.blog.style == "wordpress" and path == "/wp-sitemap.xml":
+            return self._get_sitemap_index(
+                [f"{self.base_url}/wp-sitemap-posts-post-{number}.xml" for number in range(1, pages_count + 1)]
+            )
+        elif self.blog.style == "wordpress" and path.startswith("/wp-sitemap-posts-post-"):
+            page = int(path.split("-")[-1].split(".")[0])
+        else:
+            return None
+        if page is None or not 1 <= page <= pages_count:
+            return None
+        posts = range((page - 1) * SITEMAP_PAGE_SIZE, min(page * SITEMAP_PAGE_SIZE, self.blog.posts))
+        return self._get_urlset([f"{self.base_url}{self.get_post_path(post)}" for post in posts])
+
+    def get_home(self) -> str:
+        links = "".join(
+            f'<li><a href="{self.base_url}{self.get_post_path(post)}">Post {post}</a></li>'
+            for post in range(min(self.blog.posts, 10))
+        )
+        return (
+            '<html lang="en"><head><title>Synthetic blog</title></head>'
+            + f'<body><div id="header"><h1>Synthetic blog</h1></div><ul>{links}</ul></body></html>'
+        )
+
+    def _get_paragraphs(self, post: int) -> str:
+        sentence = f"Post {post} is generated for benchmarks, it has some <b>bold</b> and <i>italic</i> text. "
+        return "".join(f"<p>{sentence * 6}</p>" for _ in range(8))
+
+    def _get_images_html(self, post: int) -> str:
+        images_html = ""
+        for image in range(self.blog.images_per_post):
+            image_url = f"{self.base_url}/images/{post}_{image}.jpg"
+            images_html += f'<a href="{image_url}"><img src="{image_url}" alt="Image {image} of post {post}"/></a>'
+        return images_html
+
+    def _get_comments_html(self, post: int) -> str:
+        if self.blog.style == "blogger":
+            comments = "".join(
+                f'<dt class="comment-author">Reader {number}</dt>'
+                + f'<dd class="comment-body"><p>Comment {number} on post {post}, quite long one.</p></dd>'
+                for number in range(self.blog.comments)
+            )
+            return f'<div id="comments"><h4>{self.blog.comments} comments:</h4><dl id="comments-block">{comments}</dl></div>'
+        return "".join(
+            f'<div class="comment-block"><cite>Reader {number}</cite><p>Comment {number} on post {post}.</p></div>'
+            for number in range(self.blog.comments)
+        )
+
+    def get_post(self, post: int) -> str:
+        post_date = self.get_post_date(post)
+        if self.blog.style == "blogger":
+            body = (
+                f'<h2 class="date-header"><span>{post_date:%A, %d %B %Y}</span></h2>'
+                + f'<h3 class="post-title entry-title">Post {post}</h3>'
+                + f'<div class="post-body entry-content" itemprop="articleBody">{self._get_images_html(post)}'
+                + f"{self._get_paragraphs(post)}</div>"
+            )
+            head = ""
+        else:
+            body = (
+                f'<article class="post type-post"><h1 class="entry-title">Post {post}</h1>'
+                + f'<div class="entry-content">{self._get_images_html(post)}{self._get_paragraphs(post)}</div>'
+                + "</article>"
+            )
+            head = f'<meta property="article:published_time" content="{post_date.isoformat()}+00:00"/>'
+        return (
+            f'<html lang="en"><head><title>Post {post} - Synthetic blog</title>{head}</head>'
+            + f"<body>{body}{self._get_comments_html(post)}</body></html>"
+        )
+
+    def get_response(self, url: str) -> tuple[int, str, bytes]:
+        parsed = urlparse(url)
+        path = parsed.path or "/"
+        if path in self.images:
+            return 200, "image/jpeg", self.images[path]
+        if path == "/robots.txt":
+            return 200, "text/plain", self.get_robots().encode()
+        if path.endswith(".xml"):
+            page = parse_qs(parsed.query).get("page")
+            sitemap = self.get_sitemap(path, int(page[0]) if page else None)
+            if sitemap is not None:
+                return 200, "application/xml", sitemap.encode()
+        if path == "/":
+            return 200, "text/html; charset=utf-8", self.get_home().encode()
+        if path in self.posts_paths:
+            return 200, "text/html; charset=utf-8", self.get_post(self.posts_paths[path]).encode()
+        return 404, "text/plain", b"Not found"
+
+
+class SyntheticBlogServer:
+    """Serves synthetic blog from local HTTP server, running in background thread."""
+
+    def __init__(self, blog: SyntheticBlogModel, host: str = "127.0.0.1", port: int = 0):
+        synthetic_blog = SyntheticBlog(blog)
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, with_body: bool):
+                status, content_type, body = synthetic_blog.get_response(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(with_body=True)
+
+            def do_HEAD(self):
+                self._respond(with_body=False)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        synthetic_blog.base_url = self.url
+        self.blog = synthetic_blog
+        self._thread = threading.Thread(target=self.server.serve_forever, name="synthetic_blog", daemon=True)
+
+    def __enter__(self) -> "SyntheticBlogServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
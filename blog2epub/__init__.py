@@ -1,5 +1,17 @@
-from blog2epub.blog2epub_main import Blog2Epub
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from blog2epub.blog2epub_main import Blog2Epub
 
 __all__ = [
     "Blog2Epub",
 ]
+
+
+def __getattr__(name: str):
+    # crawlers pull in lxml, ebooklib, Pillow etc., so they are imported only when Blog2Epub is used
+    if name == "Blog2Epub":
+        from blog2epub.blog2epub_main import Blog2Epub
+
+        return Blog2Epub
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
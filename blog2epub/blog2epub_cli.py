@@ -1,10 +1,13 @@
 import argparse
+import os
 import platform
+import sys
 
-from blog2epub import Blog2Epub
-from blog2epub.common.book import Book
+from blog2epub.common.globals import VOLUME_SPLIT_OPTIONS
 from blog2epub.common.interfaces import EmptyInterface
-from blog2epub.models.configuration import ConfigurationModel
+
+# Crawlers, ebook and models are imported in functions, after arguments are parsed,
+# so --help, argument errors and shell completion don't wait for lxml, ebooklib, Pillow or pydantic.
 
 
 class CliInterface(EmptyInterface):
@@ -15,13 +18,72 @@ class CliInterface(EmptyInterface):
         print(e)
 
 
+def _print_metrics(interface: EmptyInterface):
+    from blog2epub.common.profiler import Profiler
+
+    interface.metrics.close()
+    if isinstance(interface.metrics, Profiler):
+        interface.metrics.stop()
+        report = interface.metrics.get_report()
+        with open(f"{interface.metrics.dump_path}.txt", "w", encoding="utf-8") as f:
+            f.write(report)
+        interface.print(report)
+        return
+    summary = interface.metrics.get_summary()
+    if summary:
+        interface.print(summary)
+
+
 def validate_argument(arg_value, valid_values):
     """Validates if the given argument value is in the list of valid values."""
     if arg_value not in valid_values:
         raise argparse.ArgumentTypeError(f"Invalid value. Choose from: {valid_values}")
     return arg_value
 
-def main():
+
+def batch_main(argv: list[str]):
+    parser = argparse.ArgumentParser(
+        prog="blog2epub batch",
+        description="Convert many blogs concurrently, in one process.",
+    )
+    parser.add_argument("file", help="text file with one blog url per line, or YAML list of blogs with options")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="number of blogs crawled at once")
+    parser.add_argument("--max-connections", type=int, default=16, help="limit of concurrent requests in total")
+    parser.add_argument("--max-per-host", type=int, default=2, help="limit of concurrent requests per host")
+    parser.add_argument("--cpu", type=int, default=0, help="image processing workers in total (default: cpu count)")
+    parser.add_argument("-q", "--quality", type=int, default=40, help="images quality (0-100)")
+    parser.add_argument("-l", "--limit", type=int, default=None, help="articles limit")
+    parser.add_argument(
+        "-s", "--summary", default="./downloads/batch_summary.json", help="JSON summary file with results of all blogs"
+    )
+    args = parser.parse_args(argv)
+    from blog2epub.common.batch import BatchRunner, load_batch_file
+    from blog2epub.models.configuration import ConfigurationModel
+
+    configuration = ConfigurationModel(
+        limit=str(args.limit),
+        images_quality=args.quality,
+        destination_folder="./downloads",
+    )
+    runner = BatchRunner(
+        configuration=configuration,
+        interface=CliInterface(),
+        jobs=args.jobs,
+        max_connections=args.max_connections,
+        max_per_host=args.max_per_host,
+        cpu_budget=args.cpu,
+        platform_name=f"CLI {platform.system()} {platform.release()}",
+    )
+    summary = runner.run(load_batch_file(args.file))
+    os.makedirs(os.path.dirname(os.path.abspath(args.summary)), exist_ok=True)
+    with open(args.summary, "w") as f:
+        f.write(summary.model_dump_json(indent=2))
+    print(f"{len(summary.blogs) - summary.failures} of {len(summary.blogs)} blogs converted, summary: {args.summary}")
+    if summary.failures:
+        sys.exit(1)
+
+
+def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="Blog2epub Cli interface",
         description="Convert blog (blogspot.com, wordpress.com or another based on Wordpress) to epub using CLI or GUI.",
@@ -30,36 +92,125 @@ def main():
     parser.add_argument("-l", "--limit", type=int, default=None, help="articles limit")
     parser.add_argument("-s", "--skip", type=int, default=None, help="number of skipped articles")
     parser.add_argument("-q", "--quality", type=int, default=40, help="images quality (0-100)")
+    parser.add_argument("-b", "--bw", action="store_true", help="grayscale images optimised for e-ink readers")
     valid_engines = ["default", "wordpress", "blogger", "nrdblog_cmosnet", "nrdblog.cmosnet.eu"]
     parser.add_argument("-e", "--engine", type=lambda x: validate_argument(x, valid_engines), default="default", help="specific engine to use for downloading. choose from: {}".format(valid_engines))
     parser.add_argument("-o", "--output", help="output epub file name")
+    parser.add_argument("-m", "--max-size", type=float, default=0, help="maximum epub file size in MB")
+    parser.add_argument(
+        "--max-chapter-size", type=int, default=512, help="split articles larger than this into pages, in KB"
+    )
+    parser.add_argument(
+        "--images-workers", type=int, default=0, help="number of image processing workers (default: cpu count)"
+    )
+    parser.add_argument(
+        "--images-pool",
+        type=lambda x: validate_argument(x, ["thread", "process"]),
+        default="thread",
+        help="image processing pool: thread or process",
+    )
+    parser.add_argument("--fetch-workers", type=int, default=4, help="number of pages downloaded at once")
+    parser.add_argument("--parse-workers", type=int, default=2, help="number of pages parsed at once")
+    parser.add_argument("--images-fetch-workers", type=int, default=4, help="number of images downloaded at once")
+    parser.add_argument(
+        "-r", "--resume", action="store_true", help="continue previous crawl of this blog from its checkpoint"
+    )
+    parser.add_argument("--warc-record", default="", help="record all requests and responses to this WARC file")
+    parser.add_argument("--warc-replay", default="", help="replay crawl from this WARC file, without network access")
+    parser.add_argument(
+        "-i", "--incremental", action="store_true", help="reuse unchanged chapters and images from previous build"
+    )
+    parser.add_argument(
+        "--volumes",
+        choices=VOLUME_SPLIT_OPTIONS,
+        default=None,
+        help=f"split book into volumes by: {VOLUME_SPLIT_OPTIONS}",
+    )
+    parser.add_argument("--volume-size", type=int, default=0, help="articles (or MB with --volumes size) per volume")
+    parser.add_argument("--metrics", default=None, help="write progress events to this JSON-lines file")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the run: write cProfile dump and report of the slowest stages, articles and images",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default="./downloads/blog2epub.pstats",
+        help="cProfile dump file of --profile, report is written next to it (.txt)",
+    )
+    parser.add_argument("--profile-top", type=int, default=10, help="number of articles and images in profile report")
     parser.add_argument("-d", "--debug", action="store_true", help="turn on debug")
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        return batch_main(sys.argv[2:])
+    args = get_parser().parse_args()
+    from blog2epub import Blog2Epub
+    from blog2epub.common.book import Book
+    from blog2epub.common.metrics import Metrics
+    from blog2epub.common.profiler import Profiler
+    from blog2epub.common.volumes import save_volumes
+    from blog2epub.models.configuration import ConfigurationModel
+
     configuration = ConfigurationModel(
         url=args.url,
         limit=str(args.limit),
         skip=str(args.skip),
         images_quality=args.quality,
+        images_bw=args.bw,
+        max_book_size_mb=args.max_size,
+        max_chapter_size_kb=args.max_chapter_size,
+        incremental=args.incremental,
+        resume=args.resume,
+        warc_record=args.warc_record,
+        warc_replay=args.warc_replay,
+        volume_split=args.volumes or "",
+        volume_size=args.volume_size,
+        images_workers=args.images_workers,
+        images_pool=args.images_pool,
+        crawl_fetch_workers=args.fetch_workers,
+        crawl_parse_workers=args.parse_workers,
+        crawl_image_fetch_workers=args.images_fetch_workers,
         engine=str(args.engine),
         filename=args.output,
         destination_folder="./downloads",
     )
+    metrics = Metrics(sink_path=args.metrics)
+    if args.profile:
+        os.makedirs(os.path.dirname(os.path.abspath(args.profile_output)), exist_ok=True)
+        metrics = Profiler(dump_path=args.profile_output, top=args.profile_top, sink_path=args.metrics)
+        metrics.start()
+    interface = CliInterface(metrics=metrics)
     blog2epub = Blog2Epub(
         url=args.url,
         configuration=configuration,
         cache_folder=configuration.destination_folder,
-        interface=CliInterface(),
+        interface=interface,
     )
     configuration.language = blog2epub.crawler.language
     blog2epub.download()
+    platform_name = f"CLI {platform.system()} {platform.release()}"
+    if configuration.volume_split:
+        save_volumes(
+            book_data=blog2epub.crawler.get_book_data(),
+            configuration=configuration,
+            interface=interface,
+            destination_folder="./downloads",
+            platform_name=platform_name,
+        )
+        _print_metrics(interface)
+        return
     ebook = Book(
         book_data=blog2epub.crawler.get_book_data(),
         configuration=configuration,
         destination_folder="./downloads",
-        interface=CliInterface(),
-        platform_name=f"CLI {platform.system()} {platform.release()}",
+        interface=interface,
+        platform_name=platform_name,
     )
     ebook.save(file_name=args.output)
+    _print_metrics(interface)
 
 
 if __name__ == "__main__":
@@ -20,6 +20,8 @@ from kivymd.uix.textfield import MDTextField  # type: ignore
 from plyer import filechooser, notification  # type: ignore
 
 from blog2epub.common.book import Book
+from blog2epub.common.book_cache import BookCache
+from blog2epub.common.volumes import save_volumes
 from blog2epub.models.book import ArticleModel
 
 if sys.__stdout__ is None or sys.__stderr__ is None:
@@ -112,6 +114,7 @@ class Blog2EpubKivyWindow(MDBoxLayout):
         self.blog2epub = None
         self.download_thread = None
         self.ebook_data = None
+        self.book_cache = BookCache()
         self._generate_lock = False
 
         self.tabs = MDTabs()
@@ -444,10 +447,12 @@ class Blog2EpubKivyWindow(MDBoxLayout):
             self.articles_table.update_row_data(self.articles_table, self._get_articles_rows())
             self.blog2epub_settings.data.language = blog2epub.crawler.language
             self.ebook_data = blog2epub.crawler.get_book_data()
+            self.book_cache.clear()
             self.articles_table.update_row_data(self.articles_table, self._get_articles_rows())
             self._update_tab_generate()
         if not blog2epub.crawler.cancelled:
             self.interface.print("Download completed.")
+            logging.info(self.interface.metrics.get_summary())
             if len(blog2epub.crawler.articles) > 0:
                 self._update_skip_value()
             if platform != "android":
@@ -486,13 +491,26 @@ class Blog2EpubKivyWindow(MDBoxLayout):
     def generate(self, *args, **kwargs):
         if not self._generate_lock:
             self._generate_lock = self.generate_button.disabled = True
-            if self.ebook_data:
+            if self.ebook_data and self.blog2epub_settings.data.volume_split:
+                volumes = save_volumes(
+                    book_data=self.ebook_data,
+                    configuration=self.blog2epub_settings.data,
+                    interface=self.interface,
+                    destination_folder=self.blog2epub_settings.data.destination_folder,
+                    platform_name=self._get_platform_name(),
+                    articles=self._get_articles_to_save(),
+                    cache=self.book_cache,
+                )
+                self.popup_success(volumes[0])
+                self._generate_lock = self.generate_button.disabled = False
+            elif self.ebook_data:
                 ebook = Book(
                     book_data=self.ebook_data,
                     configuration=self.blog2epub_settings.data,
                     interface=self.interface,
                     destination_folder=self.blog2epub_settings.data.destination_folder,
                     platform_name=self._get_platform_name(),
+                    cache=self.book_cache,
                 )
                 ebook.save(self._get_articles_to_save())
                 self.popup_success(ebook)
@@ -651,6 +669,7 @@ class Blog2EpubKivyWindow(MDBoxLayout):
 
 class KivyInterface(EmptyInterface):
     def __init__(self, console_output, console_clear, console_delete_last_line):
+        super().__init__()
         self.console_output = console_output
         self.console_clear = console_clear
         self.console_delete_last_line = console_delete_last_line
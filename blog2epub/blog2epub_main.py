@@ -1,57 +1,78 @@
+from collections.abc import Iterator
 from datetime import datetime
+from queue import Empty, Queue
+from threading import Thread
+from typing import TYPE_CHECKING
 
 from blog2epub.common.globals import VERSION
-from blog2epub.common.interfaces import EmptyInterface
-from blog2epub.crawlers import (
-    AbstractCrawler,
-    BlogspotCrawler,
-    DefaultCrawler,
-    NrdblogCmosEuCrawler,
-    WordpressCrawler,
-    ZeissIkonVEBCrawler,
-)
-from blog2epub.models.configuration import ConfigurationModel
+from blog2epub.crawlers.registry import ENGINES
+
+# homepage probe for generator meta shouldn't hold the crawl for long (seconds)
+PROBE_TIMEOUT = 10
+
+if TYPE_CHECKING:
+    from blog2epub.common.interfaces import EmptyInterface
+    from blog2epub.common.throttle import ConnectionLimiter
+    from blog2epub.crawlers import AbstractCrawler
+    from blog2epub.models.book import ArticleModel, CrawledArticleModel
+    from blog2epub.models.configuration import ConfigurationModel
 
 
 class Blog2Epub:
     """Main Blog2Epub class."""
 
     version = VERSION
-    crawler: AbstractCrawler
+    crawler: "AbstractCrawler"
+    # homepage fetched by engine probe, handed over to crawler's cache
+    _homepage: tuple[str, bytes] | None
 
-    ENGINES_MAP = {
-        "wordpress": WordpressCrawler,
-        "blogger": BlogspotCrawler,
-        "nrdblog_cmosnet": NrdblogCmosEuCrawler,
-        "zeissikonveb": ZeissIkonVEBCrawler
-    }
+    ENGINES_MAP = ENGINES
 
-    def get_crawler(self, url, engine, crawler_args):
-        self.crawler = DefaultCrawler(**crawler_args)  # type: ignore
+    def _fetch_homepage(self, url: str) -> bytes | None:
+        from requests.exceptions import RequestException
 
-        if(engine == "default"):
-            if url.find(".blogspot.") > -1:
-                engine = "blogger"
-            if url.find(".wordpress.com") > -1:
-                engine = "wordpress"
-            if url.find("nrdblog.cmosnet.eu") > -1:
-                engine = "nrdblog_cmosnet"
-            if url.find("zeissikonveb.de") > -1:
-                engine = "zeissikonveb"
+        from blog2epub.common.warc import get_session
+
+        session = get_session(self.connection_limiter, warc_replay=self.configuration.warc_replay)
+        try:
+            response = session.get(url, timeout=PROBE_TIMEOUT)
+        except RequestException:
+            return None
+        finally:
+            session.close()
+        if response.status_code != 200:
+            return None
+        self._homepage = (url, response.content)
+        return response.content
+
+    def get_crawler(self, url, engine, crawler_args):
+        """Engine is resolved before anything is constructed, so each crawl has one crawler and one downloader."""
+        from blog2epub.common.crawler import prepare_port_and_url
 
-        if(engine in self.ENGINES_MAP):
-            self.crawler = self.ENGINES_MAP[engine](**crawler_args)
+        _, blog_url = prepare_port_and_url(url)
+        engine = self.ENGINES_MAP.resolve(
+            blog_url, engine, fetch=self._fetch_homepage if self.configuration.engine_probe else None
+        )
+        self.crawler = self.ENGINES_MAP[engine](**crawler_args)
+        if self._homepage is not None and self._homepage[0] == self.crawler.url:
+            # probed homepage is not downloaded again by crawler
+            self.crawler.downloader.store_content(*self._homepage)
+        self._homepage = None
 
     def __init__(
         self,
         url: str,
-        configuration: ConfigurationModel,
-        interface: EmptyInterface,
+        configuration: "ConfigurationModel",
+        interface: "EmptyInterface",
         start: datetime | None = None,
         end: datetime | None = None,
         file_name: str | None = None,
         cache_folder: str = "",
+        connection_limiter: "ConnectionLimiter | None" = None,
     ):
+        self.configuration = configuration
+        self.connection_limiter = connection_limiter
+        self._homepage = None
         # TODO: Refactor this!
         crawler_args = {
             "url": url,
@@ -61,9 +82,51 @@ class Blog2Epub:
             "file_name": file_name,
             "cache_folder": cache_folder,
             "interface": interface,
+            "connection_limiter": connection_limiter,
         }
 
         self.get_crawler(url, configuration.engine, crawler_args)
 
     def download(self):
         self.crawler.crawl()
+
+    def iter_articles(self, queue_size: int = 8) -> Iterator["CrawledArticleModel"]:
+        """Crawl in background and yield articles, together with paths of their processed images, as soon as
+        they are ready. When consumer is slower, crawl waits for it. Closing the generator (e.g. breaking
+        the loop) cancels the crawl."""
+        from blog2epub.models.book import CrawledArticleModel
+
+        finished = object()
+        articles: Queue = Queue(maxsize=max(1, queue_size))
+
+        def on_article(article: "ArticleModel") -> bool:
+            articles.put(article)
+            return not self.crawler.cancelled
+
+        def crawl():
+            try:
+                self.crawler.crawl()
+            finally:
+                articles.put(finished)
+
+        self.crawler.on_article = on_article
+        crawl_thread = Thread(target=crawl, name="blog2epub_crawl", daemon=True)
+        crawl_thread.start()
+        try:
+            while True:
+                article = articles.get()
+                if article is finished:
+                    break
+                image_paths = self.crawler.downloader.wait_for_article_images(article.images)
+                self.crawler.remove_missing_images(article)
+                yield CrawledArticleModel(article=article, image_paths=image_paths)
+        finally:
+            if crawl_thread.is_alive():
+                self.crawler.cancelled = True
+            while crawl_thread.is_alive():
+                # crawl thread may be waiting for free place in the queue
+                try:
+                    articles.get(timeout=0.1)
+                except Empty:
+                    pass
+            self.crawler.on_article = None
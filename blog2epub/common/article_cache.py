@@ -0,0 +1,44 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from pydantic import ValidationError
+
+from blog2epub.models.book import ArticleModel, DirModel
+
+
+class ArticleCache:
+    """Extracted articles keyed by hash of raw page and fingerprint of the parser (crawler, article factory,
+    their patterns and version), so changing any of them invalidates the cache without any bookkeeping."""
+
+    def __init__(self, dirs: DirModel):
+        self.path = os.path.join(dirs.path, "articles")
+
+    @staticmethod
+    def get_key(html_content: bytes, parser_fingerprint: str) -> str:
+        m = hashlib.sha1()
+        m.update(html_content)
+        m.update(parser_fingerprint.encode("utf-8"))
+        return m.hexdigest()
+
+    def _get_file_path(self, key: str) -> str:
+        return os.path.join(self.path, key + ".json.gz")
+
+    def get(self, key: str) -> ArticleModel | None:
+        file_path = self._get_file_path(key)
+        if not os.path.isfile(file_path):
+            return None
+        try:
+            with gzip.open(file_path, "rb") as f:
+                return ArticleModel.model_validate_json(f.read())
+        except (OSError, EOFError, ValidationError):
+            return None
+
+    def set(self, key: str, article: ArticleModel):
+        os.makedirs(self.path, exist_ok=True)
+        file_path = self._get_file_path(key)
+        temp_file_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with gzip.open(temp_file_path, "wb") as f:
+            f.write(article.model_dump_json().encode("utf-8"))
+        os.replace(temp_file_path, file_path)
@@ -0,0 +1,159 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import yaml
+
+from blog2epub.blog2epub_main import Blog2Epub
+from blog2epub.common.book import Book, set_locale
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.throttle import ConnectionLimiter
+from blog2epub.common.volumes import save_volumes
+from blog2epub.models.batch import BatchBlogModel, BatchResultModel, BatchSummaryModel
+from blog2epub.models.configuration import ConfigurationModel
+
+
+def load_batch_file(file_path: str) -> list[BatchBlogModel]:
+    """Blogs list - plain text with one url per line, or YAML list of urls or of mappings with url, output
+    and any configuration options (e.g. limit, images_quality, engine)."""
+    with open(file_path) as f:
+        if os.path.splitext(file_path)[1].lower() in (".yaml", ".yml"):
+            entries = yaml.safe_load(f) or []
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+    blogs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            blogs.append(BatchBlogModel(url=entry))
+            continue
+        options = dict(entry)
+        url = options.pop("url")
+        output = options.pop("output", None)
+        unknown_options = set(options) - set(ConfigurationModel.model_fields)
+        if unknown_options:
+            raise ValueError(f"Unknown options for {url}: {', '.join(sorted(unknown_options))}")
+        blogs.append(BatchBlogModel(url=url, output=output, options=options))
+    return blogs
+
+
+class BatchInterface(EmptyInterface):
+    """Output of one of concurrent crawls - whole lines prefixed with blog url, progress dots are dropped."""
+
+    def __init__(self, interface: EmptyInterface, name: str):
+        super().__init__(metrics=interface.metrics)
+        self.interface = interface
+        self.name = name
+
+    def delete_line(self):
+        pass
+
+    def print(self, text: str, end: str = "\n"):
+        if end == "\n" and str(text).strip(". "):
+            self.interface.print(f"[{self.name}] {text}")
+
+
+class BatchRunner:
+    """Crawls many blogs concurrently in one process. All of them share connection limiter (global and
+    per host limit of requests) and cpu budget, which is split between jobs as image processing workers.
+    Locale is global for the process, so it's set once from batch configuration and books don't change it."""
+
+    def __init__(
+        self,
+        configuration: ConfigurationModel,
+        interface: EmptyInterface,
+        jobs: int = 4,
+        max_connections: int = 16,
+        max_per_host: int = 2,
+        cpu_budget: int = 0,
+        platform_name: str = "",
+    ):
+        self.configuration = configuration
+        self.interface = interface
+        self.jobs = max(1, jobs)
+        self.connection_limiter = ConnectionLimiter(max_connections=max_connections, max_per_host=max_per_host)
+        self.cpu_budget = cpu_budget or os.cpu_count() or 1
+        self.platform_name = platform_name
+
+    def _get_configuration(self, blog: BatchBlogModel) -> ConfigurationModel:
+        options = {
+            key: str(value) if key in ("limit", "skip") and value is not None else value
+            for key, value in blog.options.items()
+        }
+        configuration = ConfigurationModel.model_validate(
+            {**self.configuration.model_dump(), **options, "url": blog.url}
+        )
+        if "images_workers" not in blog.options:
+            configuration.images_workers = max(1, self.cpu_budget // self.jobs)
+        if "crawl_parse_workers" not in blog.options:
+            configuration.crawl_parse_workers = 1
+        return configuration
+
+    def _save(
+        self, blog: BatchBlogModel, blog2epub: Blog2Epub, configuration: ConfigurationModel, interface: EmptyInterface
+    ) -> list[Book]:
+        book_data = blog2epub.crawler.get_book_data()
+        if configuration.volume_split:
+            return save_volumes(
+                book_data=book_data,
+                configuration=configuration,
+                interface=interface,
+                destination_folder=configuration.destination_folder,
+                platform_name=self.platform_name,
+                change_locale=False,
+            )
+        ebook = Book(
+            book_data=book_data,
+            configuration=configuration,
+            interface=interface,
+            destination_folder=configuration.destination_folder,
+            platform_name=self.platform_name,
+            change_locale=False,
+        )
+        ebook.save(file_name=blog.output)
+        return [ebook]
+
+    def run_blog(self, blog: BatchBlogModel) -> BatchResultModel:
+        result = BatchResultModel(url=blog.url)
+        interface = BatchInterface(self.interface, blog.url)
+        blog2epub = None
+        start = time.perf_counter()
+        try:
+            configuration = self._get_configuration(blog)
+            blog2epub = Blog2Epub(
+                url=blog.url,
+                configuration=configuration,
+                interface=interface,
+                cache_folder=configuration.destination_folder,
+                connection_limiter=self.connection_limiter,
+            )
+            configuration.language = blog2epub.crawler.language or configuration.language
+            blog2epub.download()
+            result.crawl_time = time.perf_counter() - start
+            result.articles = len(blog2epub.crawler.articles)
+            if not blog2epub.crawler.articles:
+                raise ValueError("No articles found")
+            build_start = time.perf_counter()
+            books = self._save(blog, blog2epub, configuration, interface)
+            result.build_time = time.perf_counter() - build_start
+            result.epub_files = [book.file_full_path for book in books if book.file_full_path]
+            result.epub_bytes = sum(os.path.getsize(file_path) for file_path in result.epub_files)
+            result.images = sum(len(article.images) for article in blog2epub.crawler.articles)
+            result.success = True
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            interface.print(f"Failed: {result.error}")
+        if blog2epub is not None:
+            result.requests = blog2epub.crawler.downloader.session.requests_count
+            result.downloaded_bytes = blog2epub.crawler.downloader.session.bytes_downloaded
+        return result
+
+    def run(self, blogs: list[BatchBlogModel]) -> BatchSummaryModel:
+        summary = BatchSummaryModel(started=datetime.now(), jobs=self.jobs)
+        set_locale(self.configuration.language, self.interface)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="blog2epub_batch") as executor:
+            summary.blogs = list(executor.map(self.run_blog, blogs))
+        summary.total_time = time.perf_counter() - start
+        summary.failures = len([result for result in summary.blogs if not result.success])
+        return summary
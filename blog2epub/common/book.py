@@ -1,23 +1,84 @@
 import datetime
+import hashlib
 import locale
 import os
 import re
+import shutil
 import tempfile
+import time
 import zipfile
+import zlib
+from html import escape
 
+import filetype  # type: ignore
 from ebooklib.epub import (  # type: ignore
     EpubBook,
     EpubHtml,
     EpubItem,
     EpubNav,
     EpubNcx,
-    write_epub,
 )
+from lxml import etree, html
 
+from blog2epub.common.book_cache import BookCache
 from blog2epub.common.cover import Cover
+from blog2epub.common.epub_writer import EpubFile, write_epub
+from blog2epub.common.images import encode_to_budget
 from blog2epub.common.interfaces import EmptyInterface
-from blog2epub.models.book import ArticleModel, BookModel
+from blog2epub.models.book import ArticleModel, BookModel, BuildRecordModel, ImageModel
 from blog2epub.models.configuration import ConfigurationModel
+from blog2epub.models.events import BookWrittenEvent
+
+# Rough size of cover, css, nav, ncx and opf - used when fitting book into size limit
+COVER_SIZE_ESTIMATE = 250 * 1024
+METADATA_SIZE_ESTIMATE = 20 * 1024
+CHAPTER_METADATA_SIZE_ESTIMATE = 512
+BOOK_SIZE_SAFETY_MARGIN = 0.97
+IMAGE_REFERENCE_RE = re.compile(r"""images/([^"'\s>]+)""")
+
+
+def _get_html_blocks(fragment: str, max_size: int) -> list[str]:
+    """Top level elements of html fragment, wrapper divs larger than max_size are unpacked. Text nodes are
+    parsed (unescaped) strings, so they are escaped again."""
+    try:
+        elements = html.fragments_fromstring(fragment)
+    except (etree.ParserError, ValueError):
+        return [fragment]
+    blocks = []
+    for element in elements:
+        if isinstance(element, str):
+            blocks.append(escape(element, quote=False))
+            continue
+        block = html.tostring(element, encoding="unicode")
+        if element.tag == "div" and len(element) and len(block.encode("utf-8")) > max_size:
+            if element.text:
+                blocks.append(escape(element.text, quote=False))
+            inner = "".join(html.tostring(child, encoding="unicode") for child in element)
+            blocks += _get_html_blocks(inner, max_size)
+            if element.tail:
+                blocks.append(escape(element.tail, quote=False))
+        else:
+            blocks.append(block)
+    return blocks
+
+
+def split_html(fragment: str, max_size: int) -> list[str]:
+    """Split html fragment into pages of up to max_size bytes, only between top level elements."""
+    pages = [""]
+    for block in _get_html_blocks(fragment, max_size):
+        if pages[-1] and len((pages[-1] + block).encode("utf-8")) > max_size:
+            pages.append("")
+        pages[-1] += block
+    return pages
+
+
+def set_locale(language: str, interface: EmptyInterface):
+    """Locale is global for the process, dates (month names) of the book are formatted with it."""
+    try:
+        locale.setlocale(locale.LC_ALL, language)
+        interface.print(f"Locale set as {language}")
+    except locale.Error:
+        interface.print(f"Can't set locale as {language}, but nevermind.")
 
 
 class Book:
@@ -78,6 +139,9 @@ class Book:
         interface: EmptyInterface,
         destination_folder: str = ".",
         platform_name: str = "",
+        volume: int | None = None,
+        cache: BookCache | None = None,
+        change_locale: bool = True,
     ):
         self.start: datetime.date | None = None
         self.end: datetime.date | None = None
@@ -90,19 +154,17 @@ class Book:
         self.subtitle = None
         self.configuration = configuration
         self.interface = interface
-        self._set_locale()
+        self.volume = volume
+        self.cache = cache
+        if change_locale:
+            set_locale(self.configuration.language, self.interface)
         self.chapters: list[Chapter] = []
         self.table_of_contents: list[EpubHtml] = []
         self.file_name: str = self._get_new_file_name()
         self.destination_folder = destination_folder
         self.platform_name = platform_name
-
-    def _set_locale(self):
-        try:
-            locale.setlocale(locale.LC_ALL, self.configuration.language)
-            self.interface.print(f"Locale set as {self.configuration.language}")
-        except locale.Error:
-            self.interface.print(f"Can't set locale as {self.configuration.language}, but nevermind.")
+        self._image_paths: dict[str, str] = {}
+        self._budget_dir: str | None = None
 
     def _get_subtitle(self):
         if self.end is None:
@@ -113,25 +175,58 @@ class Book:
             return self.start.strftime("%d %B") + " - " + self.end.strftime("%d %B %Y")
         return self.start.strftime("%d %B %Y") + " - " + self.end.strftime("%d %B %Y")
 
+    def _get_file_name_prefix(self) -> str:
+        if self.volume is None:
+            return self.book_data.file_name_prefix or ""
+        return f"{self.book_data.file_name_prefix}_vol{self.volume:02d}"
+
+    def _get_title(self) -> str:
+        if self.volume is None:
+            return self.book_data.title or ""
+        return f"{self.book_data.title}, vol. {self.volume}"
+
     def _get_new_file_name(self) -> str:
-        new_file_name = self.book_data.file_name_prefix
+        file_name_prefix = self._get_file_name_prefix()
+        new_file_name = file_name_prefix
         if self.start:
             start_date: str = self.start.strftime("%Y.%m.%d")
             if self.end and self.start != self.end:
                 end_date: str = self.end.strftime("%Y.%m.%d")
-                new_file_name = f"{self.book_data.file_name_prefix}_{start_date}-{end_date}"
+                new_file_name = f"{file_name_prefix}_{start_date}-{end_date}"
             else:
-                new_file_name = f"{self.book_data.file_name_prefix}_{start_date}"
+                new_file_name = f"{file_name_prefix}_{start_date}"
         return f"{new_file_name}.epub"
 
     def _add_chapters(self, articles: list[ArticleModel]):
         self.chapters = []
+        chapters_uids = set()
         for article in articles:
             number = len(self.chapters) + 1
+            uid = Chapter.get_uid(article)
+            duplicate = 1
+            while uid in chapters_uids:
+                # the same article url can appear twice, each copy needs its own file
+                duplicate += 1
+                uid = f"{Chapter.get_uid(article)}-{duplicate}"
             try:
-                self.chapters.append(Chapter(article, number, self.configuration.language))
+                chapter = self._get_chapter(article, number, uid)
             except TypeError as e:
                 print(e)
+                continue
+            chapters_uids.add(uid)
+            self.chapters.append(chapter)
+
+    def _get_chapter(self, article: ArticleModel, number: int, uid: str) -> "Chapter":
+        language = self.configuration.language
+        max_size = self.configuration.max_chapter_size_kb * 1024
+        if self.cache is None:
+            return Chapter(article, number, language, max_size, uid)
+        chapter = self.cache.get_chapter(
+            Chapter.get_fingerprint(article, language, max_size, uid),
+            lambda: Chapter(article, number, language, max_size, uid),
+        )
+        chapter.number = number
+        return chapter
 
     def get_cover_title(self):
         cover_title = self.book_data.title + " "
@@ -149,49 +244,38 @@ class Book:
                 cover_title = cover_title + ed + "-" + self.start
         return cover_title
 
-    def _add_cover(self):
+    def _add_cover(self, ebook: EpubBook):
+        """Cover page and image go into manifest before the book is written, so archive is written only once."""
         self.cover = Cover(
             dirs=self.book_data.dirs,
             interface=self.interface,
             file_name=self.file_name,
-            blog_url=self.book_data.file_name_prefix,
-            title=self.book_data.title,
-            subtitle=self.subtitle,
+            blog_url=self.book_data.file_name_prefix or "",
+            title=self._get_title(),
+            subtitle=self.subtitle or "",
             images=self.book_data.images,
             platform_name=self.platform_name,
+            cache=self.cache,
         )
         cover_file_name, cover_file_full_path = self.cover.generate()
         self.cover_image_path = cover_file_full_path
-        cover_html = self.cover_html.replace("###FILE###", cover_file_name)
-        cover_html_fn = "EPUB/cover.xhtml"
-        content_opf_fn = "EPUB/content.opf"
-        if os.path.isfile(self.file_full_path):
-            with zipfile.ZipFile(self.file_full_path, "r") as zf:
-                content_opf = zf.read(content_opf_fn)
-            tmpfd, tmpname = tempfile.mkstemp(dir=os.path.dirname(self.file_full_path))
-            os.close(tmpfd)
-            with zipfile.ZipFile(self.file_full_path, "r") as zin:
-                with zipfile.ZipFile(tmpname, "w") as zout:
-                    zout.comment = zin.comment  # preserve the comment
-                    for item in zin.infolist():
-                        if item.filename not in [cover_html_fn, content_opf_fn]:
-                            zout.writestr(item, zin.read(item.filename))
-            os.remove(self.file_full_path)
-            os.rename(tmpname, self.file_full_path)
-            with zipfile.ZipFile(self.file_full_path, "a") as zf:
-                zf.writestr(cover_html_fn, cover_html)
-                zf.write(cover_file_full_path, "EPUB/" + cover_file_name)
-                zf.writestr(content_opf_fn, self._upgrade_opf(content_opf, cover_file_name))
-
-            self.interface.print(f"Epub created: {self.file_full_path}")
-
-    def _upgrade_opf(self, content_opt, cover_file_name):
-        new_manifest = (
-            '<manifest><item href="cover.xhtml" id="cover" media-type="application/xhtml+xml"/>'
-            + f'<item href="{cover_file_name}" id="cover_img" media-type="image/jpeg"/>'
+        cover_page = EpubItem(
+            uid="cover",
+            file_name="cover.xhtml",
+            media_type="application/xhtml+xml",
+            content=self.cover_html.replace("###FILE###", cover_file_name),
+        )
+        cover_page.properties = ["svg"]
+        ebook.add_item(cover_page)
+        cover_image = EpubFile(
+            uid="cover_img",
+            file_name=cover_file_name,
+            media_type="image/jpeg",
+            source_path=cover_file_full_path,
         )
-        content_opt = content_opt.decode("utf-8").replace("<manifest>", new_manifest)
-        return content_opt
+        cover_image.properties = ["cover-image"]
+        ebook.add_item(cover_image)
+        ebook.add_metadata(None, "meta", "", {"name": "cover", "content": "cover_img"})
 
     def _add_table_of_contents(self, ebook: EpubBook):
         self.table_of_contents.reverse()
@@ -208,25 +292,144 @@ class Book:
         )
         ebook.add_item(nav_css)
 
-    def _include_images(self):
+    @staticmethod
+    def _get_image_media_type(image_path: str) -> str:
+        """Images which already met the target are kept in their original format (jpeg, png or gif)."""
+        image_type = filetype.guess(image_path)
+        if image_type is not None and image_type.MIME in ("image/png", "image/gif"):
+            return image_type.MIME
+        return "image/jpeg"
+
+    def _get_referenced_images(self) -> set[str]:
+        referenced_images = set()
+        for chapter in self.chapters:
+            referenced_images |= chapter.images
+        return referenced_images
+
+    def _get_images_to_include(self) -> list[ImageModel]:
+        """Only images referenced by chapters being written, so deselected articles don't bring their images."""
+        images = []
         images_included = set()
         if self.configuration.include_images:
-            for image_number, image in enumerate(self.book_data.images, start=1):
+            referenced_images = self._get_referenced_images()
+            for image in self.book_data.images:
                 if (
                     image
                     and image.hash not in images_included
+                    and image.file_name in referenced_images
                     and os.path.isfile(os.path.join(self.book_data.dirs.images, image.file_name))
                 ):
-                    with open(os.path.join(self.book_data.dirs.images, image.file_name), "rb") as f:
-                        image_content = f.read()
-                    epub_img = EpubItem(
-                        uid=f"img{image_number}",
-                        file_name="images/" + image.file_name,
-                        media_type="image/jpeg",
-                        content=image_content,
-                    )
-                    self.book.add_item(epub_img)
+                    images.append(image)
                     images_included.add(image.hash)
+        return images
+
+    def _get_image_path(self, image: ImageModel) -> str:
+        return self._image_paths.get(image.file_name, os.path.join(self.book_data.dirs.images, image.file_name))
+
+    def _include_images(self):
+        for image_number, image in enumerate(self._get_images_to_include(), start=1):
+            image_path = self._get_image_path(image)
+            epub_img = EpubFile(
+                uid=f"img{image_number}",
+                file_name="images/" + image.file_name,
+                media_type=self._get_image_media_type(image_path),
+                source_path=image_path,
+            )
+            self.book.add_item(epub_img)
+
+    def _estimate_text_size(self) -> int:
+        text_size = METADATA_SIZE_ESTIMATE + len(self.style)
+        if self.cover_image_path and os.path.isfile(self.cover_image_path):
+            text_size += os.path.getsize(self.cover_image_path)
+        else:
+            text_size += COVER_SIZE_ESTIMATE
+        for chapter in self.chapters:
+            for part in chapter.parts:
+                text_size += len(zlib.compress(part.content.encode("utf-8"))) + CHAPTER_METADATA_SIZE_ESTIMATE
+        return text_size
+
+    def _fit_images_into_size_limit(self):
+        """Choose per-image quality and dimensions, so the whole book fits into max_book_size_mb."""
+        if not self.configuration.max_book_size_mb:
+            return
+        size_limit = int(self.configuration.max_book_size_mb * 1024 * 1024 * BOOK_SIZE_SAFETY_MARGIN)
+        images_budget = size_limit - self._estimate_text_size()
+        images = self._get_images_to_include()
+        images_sizes = {image.file_name: os.path.getsize(self._get_image_path(image)) for image in images}
+        images_total = sum(images_sizes.values())
+        if images_total <= images_budget:
+            return
+        if images_budget <= 0:
+            self.interface.print("Text alone exceeds book size limit, images will be reduced to minimum.")
+        self.interface.print(
+            f"Fitting {len(images)} images ({images_total / 1024 / 1024:.1f} MB) "
+            + f"into {max(images_budget, 0) / 1024 / 1024:.1f} MB"
+        )
+        self._budget_dir = tempfile.mkdtemp(dir=self.book_data.dirs.path)
+        # Smallest images first, so budget they don't use is passed on to the larger ones
+        for image in sorted(images, key=lambda i: images_sizes[i.file_name]):
+            image_size = images_sizes[image.file_name]
+            image_budget = int(image_size * max(images_budget, 0) / images_total) if images_total else 0
+            if image_size > image_budget:
+                destination = os.path.join(self._budget_dir, image.file_name)
+                image_size = encode_to_budget(
+                    self._get_image_path(image),
+                    destination,
+                    max_bytes=image_budget,
+                    quality=self.configuration.images_quality,
+                )
+                self._image_paths[image.file_name] = destination
+            images_budget -= image_size
+            images_total -= images_sizes[image.file_name]
+
+    def _clean_size_limit_files(self):
+        if self._budget_dir is not None:
+            shutil.rmtree(self._budget_dir, ignore_errors=True)
+            self._budget_dir = None
+        self._image_paths = {}
+
+    def _get_build_record_path(self) -> str:
+        return os.path.join(self.book_data.dirs.path, "builds", f"{self._get_file_name_prefix()}.json")
+
+    def _get_entries_fingerprints(self, ebook: EpubBook) -> dict[str, str]:
+        """Chapters are identified by article contents, images by size and modification time of the file."""
+        folder_name = ebook.FOLDER_NAME
+        entries = {
+            f"{folder_name}/{part.file_name}": chapter.fingerprint
+            for chapter in self.chapters
+            for part in chapter.parts
+        }
+        for image in self._get_images_to_include():
+            image_stat = os.stat(self._get_image_path(image))
+            entries[f"{folder_name}/images/{image.file_name}"] = f"{image_stat.st_size}:{image_stat.st_mtime_ns}"
+        return entries
+
+    def _get_previous_build(self, entries: dict[str, str]) -> tuple[zipfile.ZipFile | None, set[str]]:
+        """Previous build of this book and names of entries, which didn't change since then."""
+        if not self.configuration.incremental or not os.path.isfile(self._get_build_record_path()):
+            return None, set()
+        with open(self._get_build_record_path()) as f:
+            build_record = BuildRecordModel.model_validate_json(f.read())
+        if not os.path.isfile(build_record.file):
+            return None, set()
+        try:
+            previous = zipfile.ZipFile(build_record.file)
+        except zipfile.BadZipFile:
+            return None, set()
+        previous_names = set(previous.namelist())
+        reused = {
+            name
+            for name, fingerprint in entries.items()
+            if build_record.entries.get(name) == fingerprint and name in previous_names
+        }
+        self.interface.print(f"Reusing {len(reused)} of {len(entries)} entries from {build_record.file}")
+        return previous, reused
+
+    def _save_build_record(self, file_full_path: str, entries: dict[str, str]):
+        os.makedirs(os.path.dirname(self._get_build_record_path()), exist_ok=True)
+        build_record = BuildRecordModel(file=os.path.abspath(file_full_path), entries=entries)
+        with open(self._get_build_record_path(), "w") as f:
+            f.write(build_record.model_dump_json())
 
     def _update_start_end_date(self, articles: list[ArticleModel]):
         self.start = self.end = None
@@ -241,12 +444,15 @@ class Book:
 
     def _get_ebook(self) -> EpubBook:
         ebook = EpubBook()
-        ebook.set_title(self.book_data.title)
+        ebook.set_title(self._get_title())
         ebook.set_language(self.configuration.language)
         ebook.add_author(f"{self.book_data.title}, {self.book_data.file_name_prefix}")
+        self._add_cover(ebook)
         for chapter in self.chapters:
-            ebook.add_item(chapter.epub)
-            ebook.spine.append(chapter.epub)  # Important!
+            # spine is reversed below, so parts go in backwards
+            for part in reversed(chapter.parts):
+                ebook.add_item(part)
+                ebook.spine.append(part)  # Important!
             self.table_of_contents.append(chapter.epub)
         self._add_table_of_contents(ebook)
         self._add_epub_css(ebook)
@@ -282,41 +488,108 @@ class Book:
     ):
         if articles is None:
             articles = self.book_data.articles
+        start = time.perf_counter()
         self._add_chapters(articles)
         self._update_start_end_date(articles)
         self.subtitle = self._get_subtitle()
         self.file_name = file_name or self._get_new_file_name()
-        self.book = self._get_ebook()
+        ebook = self._get_ebook()
+        self.book = ebook
+        self._fit_images_into_size_limit()
         self._include_images()
-        self.file_full_path = self._get_file_full_path(destination_folder)
-        self.file_full_path = self._prevent_overwrite(self.file_full_path)
-        write_epub(self.file_full_path, self.book, {})
-        self._add_cover()
+        file_full_path = self._prevent_overwrite(self._get_file_full_path(destination_folder))
+        self.file_full_path = file_full_path
+        entries = self._get_entries_fingerprints(ebook)
+        previous, reused = self._get_previous_build(entries)
+        try:
+            write_epub(file_full_path, ebook, previous=previous, reused=reused)
+        finally:
+            if previous is not None:
+                previous.close()
+        self._save_build_record(file_full_path, entries)
+        self._clean_size_limit_files()
+        self.interface.event(
+            BookWrittenEvent(
+                file_name=self.file_full_path,
+                articles=len(articles),
+                bytes=os.path.getsize(self.file_full_path),
+                ms=(time.perf_counter() - start) * 1000,
+            )
+        )
+        self.interface.print(f"Epub created: {self.file_full_path}")
+        if self.configuration.max_book_size_mb:
+            self.interface.print(
+                f"Epub size: {os.path.getsize(self.file_full_path) / 1024 / 1024:.2f} MB "
+                + f"(limit: {self.configuration.max_book_size_mb} MB)"
+            )
+
+
+class ChapterPart(EpubHtml):
+    """EpubHtml which renders its xhtml once, as long as content stays the same."""
+
+    _rendered: tuple[str, bytes] | None = None
+
+    def get_content(self, default=None):
+        if self._rendered is None or self._rendered[0] is not self.content:
+            self._rendered = (self.content, super().get_content(default))
+        return self._rendered[1]
 
 
 class Chapter:
-    epub: EpubHtml | None = None
-
-    def __init__(self, article: ArticleModel, number: int, language: str):
-        uid = "chapter_" + str(number)
-        self.epub: EpubHtml = EpubHtml(  # type: ignore
-            title=article.title,
-            uid=uid,
-            file_name=uid + ".xhtml",
-            lang=language,  # type: ignore
-        )  # type: ignore
-        tags = self._print_tags(article)
+    def __init__(self, article: ArticleModel, number: int, language: str, max_size: int = 0, uid: str = ""):
+        uid = uid or self.get_uid(article)
+        self.number = number
+        self.fingerprint = self.get_fingerprint(article, language, max_size, uid)
+        self.images = set(IMAGE_REFERENCE_RE.findall(f"{article.content}{article.comments}"))
+        header = self.get_header(article)
+        pages = [f"{header}{article.content}{article.comments}"]
+        if max_size and len(pages[0].encode("utf-8")) > max_size:
+            pages = split_html(header + (article.content or ""), max_size)
+            if article.comments:
+                pages += split_html(article.comments, max_size)
+        self.parts: list[EpubHtml] = []
+        for page_number, page in enumerate(pages, start=1):
+            part_uid = uid if page_number == 1 else f"{uid}_{page_number}"
+            part = ChapterPart(  # type: ignore
+                title=article.title if page_number == 1 else f"{article.title} ({page_number})",
+                uid=part_uid,
+                file_name=part_uid + ".xhtml",
+                lang=language,  # type: ignore
+            )
+            if page_number < len(pages):
+                page += f'<p><a href="{uid}_{page_number + 1}.xhtml">&#8594;</a></p>'
+            part.content = f"<div>{page}</div>"
+            self.parts.append(part)
+        # Only the first part goes into table of contents, next ones just follow it in spine
+        self.epub: EpubHtml = self.parts[0]
+
+    @staticmethod
+    def get_uid(article: ArticleModel) -> str:
+        """uid doesn't depend on chapter number, so chapter file stays the same between builds."""
+        return "chapter_" + hashlib.md5(article.url.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def get_header(cls, article: ArticleModel) -> str:
+        tags = cls._print_tags(article)
         art_date = "<p>"
         if article.date is not None:
             art_date += "<i>Created: " + article.date.strftime("%d %B %Y, %H:%M") + "</i><br/>"
         art_date += "<i>Accessed: " + article.accessed.strftime("%d %B %Y, %H:%M") + "</i>"
         art_date += "</p>"
-        self.epub.content = (
-            f"<h2>{article.title}</h2>{tags}{art_date}" + f'<p><i><a href="{article.url}">{article.url}</a></i></p>'
-        )
-        self.epub.content = f"<div>{self.epub.content}{article.content}{article.comments}</div>"
+        return f"<h2>{article.title}</h2>{tags}{art_date}" + f'<p><i><a href="{article.url}">{article.url}</a></i></p>'
 
-    def _print_tags(self, article):
+    @classmethod
+    def get_fingerprint(cls, article: ArticleModel, language: str, max_size: int, uid: str) -> str:
+        """Rendered header is fingerprinted instead of raw dates, so changed "Accessed" date or locale
+        (month names) renders the chapter again."""
+        m = hashlib.sha1()
+        m.update(article.model_dump_json(exclude={"accessed"}).encode("utf-8"))
+        m.update(cls.get_header(article).encode("utf-8"))
+        m.update(f"{language}:{max_size}:{uid}".encode())
+        return m.hexdigest()
+
+    @staticmethod
+    def _print_tags(article):
         if not article.tags:
             return ""
         tags = []
@@ -0,0 +1,40 @@
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from PIL import Image
+
+
+class BookCache:
+    """Per-session cache of rendered chapters and cover mosaics. Book built again after a small change
+    of articles selection only renders what is new. Images are not cached, they are streamed from disk."""
+
+    def __init__(self):
+        self._chapters: dict[str, Any] = {}
+        self._mosaics: dict[str, Image.Image] = {}
+        # volumes are saved concurrently and can share one cache
+        self._lock = threading.Lock()
+
+    def get_chapter(self, key: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            chapter = self._chapters.get(key)
+        if chapter is None:
+            chapter = factory()
+            with self._lock:
+                self._chapters[key] = chapter
+        return chapter
+
+    def get_mosaic(self, key: str, factory: Callable[[], Image.Image]) -> Image.Image:
+        with self._lock:
+            mosaic = self._mosaics.get(key)
+        if mosaic is None:
+            mosaic = factory()
+            with self._lock:
+                self._mosaics[key] = mosaic
+        # text is drawn on the mosaic, so cached one is never handed out
+        return mosaic.copy()
+
+    def clear(self):
+        with self._lock:
+            self._chapters = {}
+            self._mosaics = {}
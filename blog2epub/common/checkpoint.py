@@ -0,0 +1,95 @@
+import os
+import shutil
+import threading
+
+from pydantic import ValidationError
+
+from blog2epub.models.book import ArticleModel, DirModel
+from blog2epub.models.checkpoint import CrawlStateModel, PageStatusModel
+
+PAGE_DONE = "done"
+PAGE_EMPTY = "empty"
+
+
+class CrawlCheckpoint:
+    """Crawl state kept in blog's cache directory: discovered pages and blog metadata, status of every
+    finished page and extracted articles. Statuses and articles are append-only JSON lines, so whatever
+    was written before crawl was cancelled or process died can be read back."""
+
+    def __init__(self, dirs: DirModel):
+        self.path = os.path.join(dirs.path, "checkpoint")
+        self._lock = threading.Lock()
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.path, "state.json")
+
+    @property
+    def status_path(self) -> str:
+        return os.path.join(self.path, "status.jsonl")
+
+    @property
+    def articles_path(self) -> str:
+        return os.path.join(self.path, "articles.jsonl")
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def save_state(self, state: CrawlStateModel):
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.state_path + ".tmp", "w") as f:
+            f.write(state.model_dump_json())
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def load_state(self) -> CrawlStateModel | None:
+        if not os.path.isfile(self.state_path):
+            return None
+        with open(self.state_path) as f:
+            try:
+                return CrawlStateModel.model_validate_json(f.read())
+            except ValidationError:
+                return None
+
+    def _append(self, file_path: str, line: str):
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with open(file_path, "a") as f:
+                f.write(line + "\n")
+
+    def set_status(self, url: str, status: str):
+        self._append(self.status_path, PageStatusModel(url=url, status=status).model_dump_json())
+
+    def add_article(self, article: ArticleModel):
+        """Article is written before its status, so page marked as done always has its article."""
+        self._append(self.articles_path, article.model_dump_json())
+        self.set_status(article.url, PAGE_DONE)
+
+    @staticmethod
+    def _read_lines(file_path: str) -> list[str]:
+        if not os.path.isfile(file_path):
+            return []
+        with open(file_path) as f:
+            return [line for line in f.read().splitlines() if line.strip()]
+
+    def load_statuses(self) -> dict[str, str]:
+        statuses = {}
+        for line in self._read_lines(self.status_path):
+            try:
+                page_status = PageStatusModel.model_validate_json(line)
+            except ValidationError:
+                # last line can be cut, when process died while writing it
+                continue
+            statuses[page_status.url] = page_status.status
+        return statuses
+
+    def load_articles(self) -> list[ArticleModel]:
+        statuses = self.load_statuses()
+        articles: dict[str, ArticleModel] = {}
+        for line in self._read_lines(self.articles_path):
+            try:
+                article = ArticleModel.model_validate_json(line)
+            except ValidationError:
+                continue
+            if statuses.get(article.url) == PAGE_DONE and article.url not in articles:
+                articles[article.url] = article
+        return list(articles.values())
@@ -3,11 +3,13 @@ import os
 import unicodedata
 from random import shuffle
 
-from imagesize import imagesize  # type: ignore
-from PIL import Image, ImageDraw, ImageEnhance, ImageFont
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
 
 from blog2epub.common.assets import asset_path
+from blog2epub.common.book_cache import BookCache
 from blog2epub.common.globals import VERSION
+from blog2epub.common.images import TILE_SIZE, save_tile
 from blog2epub.common.interfaces import EmptyInterface
 from blog2epub.models.book import DirModel, ImageModel
 
@@ -21,7 +23,7 @@ class Cover:
     Cover class used in Blog2Epub class.
     """
 
-    tile_size = 120
+    tile_size = TILE_SIZE
 
     def __init__(
         self,
@@ -33,6 +35,7 @@ class Cover:
         subtitle: str,
         images: list[ImageModel],
         platform_name: str = "",
+        cache: BookCache | None = None,
     ):
         """
         :param book: intance of Book class
@@ -43,48 +46,38 @@ class Cover:
         self.blog_url = blog_url
         self.title = unicodedata.normalize("NFKD", title)
         self.subtitle = unicodedata.normalize("NFKD", subtitle)
-        self.images = self._check_image_size(images)
+        self.images = [image for image in images if image.hash]
         self.platform_name = platform_name
-
-    def _check_image_size(self, images: list[ImageModel]) -> list[ImageModel]:
-        verified_images = []
+        self.cache = cache
+
+    def _get_tile(self, image: ImageModel) -> str | None:
+        """Cached tile of the image - images processed before tiles were introduced get it on first use."""
+        tile_path = os.path.join(self.dirs.thumbnails, image.file_name)
+        if os.path.isfile(tile_path):
+            return tile_path
+        image_path = os.path.join(self.dirs.images, image.file_name)
+        if not os.path.isfile(image_path):
+            return None
+        os.makedirs(self.dirs.thumbnails, exist_ok=True)
+        try:
+            if save_tile(image_path, tile_path, self.tile_size):
+                return tile_path
+        except (OSError, ValueError, Image.DecompressionBombError):
+            pass
+        return None
+
+    def _get_tiles(self, count: int) -> list[str]:
+        """Random tiles - only as many images are checked, as needed to fill the cover."""
+        images = self.images.copy()
+        shuffle(images)
+        tiles = []
         for image in images:
-            if image.hash:
-                i_file = os.path.join(self.dirs.images, image.file_name)
-                if os.path.isfile(i_file):
-                    i_size = imagesize.get(i_file)
-                    if i_size[0] >= self.tile_size and i_size[1] >= self.tile_size:
-                        verified_images.append(image)
-        return verified_images
-
-    def _make_thumb(self, img, size):
-        cropped_img = self._crop_image(img)
-        cropped_img.thumbnail(size, Image.LANCZOS)
-        return cropped_img
-
-    def _is_landscape(self, width, height):
-        if width >= height:
-            return True
-        return False
-
-    def _box_params_center(self, width, height):
-        if self._is_landscape(width, height):
-            upper_x = int((width / 2) - (height / 2))
-            upper_y = 0
-            lower_x = int((width / 2) + (height / 2))
-            lower_y = height
-            return upper_x, upper_y, lower_x, lower_y
-        upper_x = 0
-        upper_y = int((height / 2) - (width / 2))
-        lower_x = width
-        lower_y = int((height / 2) + (width / 2))
-        return upper_x, upper_y, lower_x, lower_y
-
-    def _crop_image(self, img):
-        upper_x, upper_y, lower_x, lower_y = self._box_params_center(img.size[0], img.size[1])
-        box = (upper_x, upper_y, lower_x, lower_y)
-        region = img.crop(box)
-        return region
+            tile = self._get_tile(image)
+            if tile is not None:
+                tiles.append(tile)
+                if len(tiles) == count:
+                    break
+        return tiles
 
     @staticmethod
     def _split_to_parts(text: str, parts: int = 2, splitter: str = " "):
@@ -154,29 +147,50 @@ class Cover:
         )
         return cover_image
 
-    def generate(self):
+    def _read_tiles(self, tiles: list[str]) -> list[np.ndarray]:
+        """Tiles which can't be read (e.g. broken file in cache) are skipped."""
+        pictures = []
+        for tile_path in tiles:
+            try:
+                with Image.open(tile_path) as tile:
+                    picture = np.asarray(tile.convert("RGB"))
+            except (OSError, ValueError, Image.DecompressionBombError):
+                continue
+            if picture.shape == (self.tile_size, self.tile_size, 3):
+                pictures.append(picture)
+        return pictures
+
+    def _compose_tiles(self) -> Image.Image:
         tiles_count_y = 5
         tiles_count_x = 7
-        cover_image = Image.new("RGB", (600, 800))
-        self.interface.print(f"Generating cover (800px*600px) from {len(self.images)} images.")
-        dark_factor = 1.0
-        if len(self.images) > 0:
-            if len(self.images) > 1:
-                shuffle(self.images)
-            i = 1
+        tiles = self._get_tiles(tiles_count_x * tiles_count_y)
+        mosaic = np.zeros((tiles_count_x * self.tile_size, tiles_count_y * self.tile_size, 3), dtype=np.uint8)
+        pictures = self._read_tiles(tiles)
+        if pictures:
             for x in range(0, tiles_count_x):
-                if len(self.images) > 1 & len(self.images) <= tiles_count_y * 2:
-                    shuffle(self.images)
+                # when there are only a few tiles, they are shuffled for every row
+                if len(pictures) <= tiles_count_y * 2:
+                    shuffle(pictures)
                 for y in range(0, tiles_count_y):
-                    img_file = os.path.join(self.dirs.images, self.images[i - 1].file_name)
-                    thumb = self._make_thumb(Image.open(img_file), (self.tile_size, self.tile_size))
-                    enhancer = ImageEnhance.Brightness(thumb)
-                    thumb = enhancer.enhance(dark_factor)
-                    dark_factor -= 0.03
-                    cover_image.paste(thumb, (y * self.tile_size, x * self.tile_size))
-                    i = i + 1
-                    if i > len(self.images):
-                        i = 1
+                    tile_number = (x * tiles_count_y + y) % len(pictures)
+                    mosaic[
+                        x * self.tile_size : (x + 1) * self.tile_size,
+                        y * self.tile_size : (y + 1) * self.tile_size,
+                    ] = pictures[tile_number]
+        # every next tile is 3% darker - applied to the whole mosaic at once
+        dark_factors = 1.0 - 0.03 * np.arange(tiles_count_x * tiles_count_y, dtype=np.float32)
+        dark_factors = np.clip(dark_factors, 0, None).reshape(tiles_count_x, tiles_count_y)
+        dark_factors = dark_factors.repeat(self.tile_size, axis=0).repeat(self.tile_size, axis=1)[..., np.newaxis]
+        mosaic = np.rint(mosaic * dark_factors).astype(np.uint8)
+        return Image.fromarray(mosaic[:800, :600])
+
+    def generate(self):
+        self.interface.print(f"Generating cover (800px*600px) from {len(self.images)} images.")
+        if self.cache is not None:
+            mosaic_key = ",".join(sorted(image.hash for image in self.images))
+            cover_image = self.cache.get_mosaic(mosaic_key, self._compose_tiles)
+        else:
+            cover_image = self._compose_tiles()
         cover_image = self._draw_text(cover_image)
         cover_image = cover_image.convert("L")
         cover_file_name = self.file_name + ".jpg"
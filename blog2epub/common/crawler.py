@@ -1,8 +1,5 @@
-import ssl
 from urllib import parse
 
-ssl._create_default_https_context = ssl._create_stdlib_context  # type: ignore
-
 
 def prepare_port_and_url(url: str) -> tuple[int, str]:
     url = url.strip()
@@ -15,6 +12,9 @@ def prepare_port_and_url(url: str) -> tuple[int, str]:
     port = parse.urlparse(url).port
     scheme = parse.urlparse(url).scheme
     hostname = parse.urlparse(url).hostname
+    if port is not None and port != default_port:
+        # e.g. locally served blog, it can't be reached without port
+        return port, f"{scheme}://{hostname}:{port}"
     return port or default_port, f"{scheme}://{hostname}"
 
 
@@ -25,7 +25,7 @@ def prepare_file_name(file_name: str | None, url: str) -> str:
     result = url.lower()
     result = result.replace("http://", "")
     result = result.replace("https://", "")
-    for x in ["/", ",", "."]:
+    for x in ["/", ",", ".", ":"]:
         result = result.replace(x, "_")
     return result
 
@@ -2,49 +2,70 @@ import gzip
 import hashlib
 import os
 import re
+import threading
 import time
 import base64
 from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
 
 import filetype  # type: ignore
 import requests
 from imagesize import imagesize  # type: ignore
-from PIL import Image
 from requests.cookies import RequestsCookieJar
 
 from blog2epub.common.crawler import clever_decode
+from blog2epub.common.images import ImageProcessor, get_variant_file_name, publish_image
 from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.throttle import ConnectionLimiter
+from blog2epub.common.warc import get_session
 from blog2epub.models.book import DirModel, ImageModel
+from blog2epub.models.events import PageFetchedEvent
+from blog2epub.models.images import ImageProfileModel, ImageTaskModel
 
 
 def prepare_directories(dirs: DirModel):
-    paths = [dirs.html, dirs.images, dirs.originals]
+    paths = [dirs.html, dirs.images, dirs.originals, dirs.variants, dirs.thumbnails]
     for p in paths:
-        if not os.path.exists(p):
-            os.makedirs(p)
+        # crawl stages run in threads, so directory can appear in the meantime
+        os.makedirs(p, exist_ok=True)
 
 
 class Downloader:
+    # pause after every image download, so blog servers are not overloaded (seconds)
+    image_download_delay: float = 1
+
     def __init__(
         self,
         dirs: DirModel,
         url: str,
         interface: EmptyInterface,
-        images_size: tuple[int, int],
-        images_quality: int,
+        images_profile: ImageProfileModel,
         ignore_downloads: list[str],
+        images_workers: int = 0,
+        images_pool: str = "thread",
+        fetch_workers: int = 1,
+        connection_limiter: ConnectionLimiter | None = None,
+        warc_record: str = "",
+        warc_replay: str = "",
     ):
         self.dirs = dirs
         self.url = url
         self.interface = interface
-        self.images_size = images_size
-        self.images_quality = images_quality
+        self.images_profile = images_profile
         self.ignore_downloads = ignore_downloads
         self.cookies = RequestsCookieJar()
-        self.session = requests.session()
+        self.session = get_session(connection_limiter, warc_record=warc_record, warc_replay=warc_replay)
+        # when recording or replaying, everything goes through the session and local caches are not read
+        self.warc_mode = bool(warc_record or warc_replay)
+        self.warc_replay = warc_replay
         self.headers: Mapping[str, str] = {}
         self.skipped_images: list[str] = []
+        self.image_processor = ImageProcessor(interface=interface, workers=images_workers, pool=images_pool)
+        self.fetch_workers = max(1, fetch_workers)
+        self._fetch_executor: ThreadPoolExecutor | None = None
+        self._image_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
 
     def get_urlhash(self, url):
         m = hashlib.md5()
@@ -106,8 +127,10 @@ class Downloader:
         # TODO: This needs refactor!
         filepath = self.get_filepath(url)
         contents = None
+        start = time.perf_counter()
+        cache_hit = not self.warc_mode and (os.path.isfile(filepath) or os.path.isfile(filepath + ".gz"))
         for _x in range(0, 3):
-            if not os.path.isfile(filepath) and not os.path.isfile(filepath + ".gz"):
+            if self.warc_mode or (not os.path.isfile(filepath) and not os.path.isfile(filepath + ".gz")):
                 contents = self.file_download(url, filepath)
 
                 if contents is not None:
@@ -130,6 +153,15 @@ class Downloader:
                     "http://" + self.url,
                     self.get_filepath("http://" + self.url),
                 )
+        if contents is not None:
+            self.interface.event(
+                PageFetchedEvent(
+                    url=url,
+                    bytes=len(contents),
+                    ms=(time.perf_counter() - start) * 1000,
+                    cache_hit=cache_hit,
+                )
+            )
         return contents
 
     def _fix_image_url(self, img: str) -> str:
@@ -186,9 +218,65 @@ class Downloader:
             return False
         with open(filepath, "wb") as f:
             f.write(image_bytes)
-        time.sleep(1)
+        if not self.warc_replay:
+            # replay doesn't touch the network, so there is no server to spare
+            time.sleep(self.image_download_delay)
         return True
-    
+
+    def _get_original_ref_path(self, img_hash: str) -> str:
+        return os.path.join(self.dirs.originals, img_hash + ".ref")
+
+    def _get_cached_original(self, img_hash: str) -> str | None:
+        """Originals are stored by content hash, url hash points to them with small .ref file."""
+        ref_fn = self._get_original_ref_path(img_hash)
+        if os.path.isfile(ref_fn):
+            with open(ref_fn) as f:
+                original_fn = os.path.join(self.dirs.originals, f.read().strip())
+            if os.path.isfile(original_fn):
+                return original_fn
+        return None
+
+    def _store_original(self, img_hash: str, downloaded_fn: str, img_type: str) -> str:
+        with open(downloaded_fn, "rb") as f:
+            content_hash = hashlib.sha1(f.read()).hexdigest()
+        original_fn = os.path.join(self.dirs.originals, content_hash + img_type)
+        if os.path.isfile(original_fn):
+            os.remove(downloaded_fn)
+        else:
+            os.replace(downloaded_fn, original_fn)
+        with open(self._get_original_ref_path(img_hash), "w") as f:
+            f.write(os.path.basename(original_fn))
+        return original_fn
+
+    def _is_valid_original(self, url: str, original_fn: str) -> bool:
+        original_img_type = filetype.guess(original_fn)
+        if original_img_type is None:
+            return False
+        if not original_img_type.MIME.startswith("image"):
+            os.remove(original_fn)
+            self.skipped_images.append(url)
+            return False
+        image_size = imagesize.get(original_fn)
+        if image_size[0] + image_size[1] < 100:
+            os.remove(original_fn)
+            self.skipped_images.append(url)
+            return False
+        return True
+
+    def _get_original(self, url: str, img_hash: str) -> str | None:
+        original_fn = None if self.warc_mode else self._get_cached_original(img_hash)
+        if original_fn is not None:
+            return original_fn
+        img_type = self.resolve_image_type(url)
+        if img_type is None:
+            self.interface.print("Cannot download image " + url + " - unsupported type")
+            return None
+        downloaded_fn = os.path.join(self.dirs.originals, img_hash + img_type)
+        self._download_image(url, downloaded_fn)
+        if not os.path.isfile(downloaded_fn) or not self._is_valid_original(url, downloaded_fn):
+            return None
+        return self._store_original(img_hash, downloaded_fn, img_type)
+
     def resolve_image_type(self, url: str) -> str | None:
         supported_mimes = {
             "image/jpeg": ".jpg",
@@ -233,75 +321,89 @@ class Downloader:
 
         return None
     
-    def _has_transparency(self, picture: Image.Image) -> bool:
-        if picture.info.get("transparency", None) is not None:
-            return True
-        if picture.mode == "P":
-            transparent = picture.info.get("transparency", -1)
-            for _, index in picture.getcolors():
-                if index == transparent:
-                    return True
-        elif picture.mode == "RGBA":
-            extrema = picture.getextrema()
-            if extrema[3][0] < 255:
-                return True
-        return False
+    def _get_image_lock(self, img_hash: str) -> threading.Lock:
+        """Same image (e.g. from blog header) can be requested by several pages at once."""
+        with self._lock:
+            if img_hash not in self._image_locks:
+                self._image_locks[img_hash] = threading.Lock()
+            return self._image_locks[img_hash]
 
     def download_image(self, image_obj: ImageModel) -> bool:
         if self._is_url_in_ignored(image_obj.url) or self._is_url_in_skipped(image_obj.url):
             return False
         image_obj.url = self._fix_image_url(image_obj.url)
         img_hash = self.get_urlhash(image_obj.url)
-        img_type = self.resolve_image_type(image_obj.url)
-        if img_type is None:
-            self.interface.print("Cannot download image " + image_obj.url + " - unsupported type")
-            return False
-        original_fn = os.path.join(self.dirs.originals, img_hash + img_type)
+        with self._get_image_lock(img_hash):
+            return self._download_image_locked(image_obj, img_hash)
+
+    def _download_image_locked(self, image_obj: ImageModel, img_hash: str) -> bool:
         resized_fn = os.path.join(self.dirs.images, img_hash + ".jpg")
-        if os.path.isfile(resized_fn):
+        if self.image_processor.is_pending(resized_fn):
             return True
-        if not os.path.isfile(resized_fn):
-            self._download_image(image_obj.url, original_fn)
-        if os.path.isfile(original_fn):
-            original_img_type = filetype.guess(original_fn)
-            if original_img_type is None:
-                return False
-            if not original_img_type.MIME.startswith("image"):
-                os.remove(original_fn)
-                self.skipped_images.append(image_obj.url)
-                return False
-            image_size = imagesize.get(original_fn)
-            if image_size[0] + image_size[1] < 100:
-                os.remove(original_fn)
-                self.skipped_images.append(image_obj.url)
-                return False
-            picture = Image.open(original_fn)
-            if picture.size[0] > self.images_size[0] or picture.size[1] > self.images_size[1]:
-                picture.thumbnail(self.images_size, Image.LANCZOS)  # type: ignore
-            
-            # Convert picture to RGB mode (with an intermediary step to RGBA if needed)
-            if picture.mode != "RGB":
-                if self._has_transparency(picture):
-                    __p = picture
-                    try:
-                        rgba_picture = picture.convert("RGBA")
-                        # Create a new background image based on the picture, fill it with white
-                        bg = Image.new("RGBA", picture.size, (255, 255, 255))
-                        # Create an alpha composite of the background with the picture
-                        picture = Image.alpha_composite(bg, rgba_picture)
-                        # And only if all of this succeeds do we close the old picture file
-                        __p.close()
-                    except ValueError:
-                        self.interface.print("Cannot explicitly cull alpha layer, falling back on pillow", end="")
-                        # Restore old picture if nothing can be done here
-                        picture = __p
-                        pass
-                picture = picture.convert("RGB")
-
-            picture.save(resized_fn, format="JPEG", quality=self.images_quality)
-            try:
-                os.remove(original_fn)
-            except PermissionError:
-                pass
+        original_fn = self._get_original(image_obj.url, img_hash)
+        if original_fn is None:
+            return False
+        variant_fn = os.path.join(self.dirs.variants, get_variant_file_name(original_fn, self.images_profile))
+        prepare_directories(self.dirs)
+        if os.path.isfile(variant_fn):
+            publish_image(variant_fn, resized_fn)
             return True
-        return False
+        self.image_processor.submit(
+            ImageTaskModel(
+                url=image_obj.url,
+                original=original_fn,
+                variant=variant_fn,
+                destination=resized_fn,
+                profile=self.images_profile,
+                tile=os.path.join(self.dirs.thumbnails, image_obj.file_name),
+            )
+        )
+        return True
+
+    def download_images(self, images: list[ImageModel]) -> list[bool]:
+        """Image fetch stage - images of an article are downloaded concurrently by fetch_workers threads."""
+        if self.fetch_workers == 1 or len(images) < 2:
+            return [self.download_image(image_obj) for image_obj in images]
+        with self._lock:
+            if self._fetch_executor is None:
+                self._fetch_executor = ThreadPoolExecutor(
+                    max_workers=self.fetch_workers, thread_name_prefix="blog2epub_fetch"
+                )
+        return list(self._fetch_executor.map(self.download_image, images))
+
+    def store_content(self, url: str, contents: bytes):
+        """Put page fetched elsewhere into cache, so get_content doesn't download it again."""
+        if self.warc_mode or os.path.isfile(self.get_filepath(url) + ".gz"):
+            return
+        prepare_directories(self.dirs)
+        self.file_write(contents, self.get_filepath(url))
+
+    def get(self, url: str) -> requests.Response:
+        """Plain request, e.g. for sitemap or robots.txt - sent with session, so connection limits apply
+        and it's counted in blog's summary."""
+        return self.session.get(url, cookies=self.cookies, headers=self.headers)
+
+    def wait_for_article_images(self, images: list[ImageModel]) -> list[str]:
+        """Wait until given images are processed, return paths of these which succeeded."""
+        image_paths = []
+        for image_obj in images:
+            image_path = os.path.join(self.dirs.images, image_obj.file_name)
+            future = self.image_processor.get_pending(image_path)
+            if future is not None:
+                future.exception()
+            if os.path.isfile(image_path):
+                image_paths.append(image_path)
+        return image_paths
+
+    def get_missing_images(self, images: list[ImageModel]) -> list[ImageModel]:
+        """Images which were accepted for processing, but their processing failed."""
+        image_paths = set(self.wait_for_article_images(images))
+        return [
+            image_obj for image_obj in images if os.path.join(self.dirs.images, image_obj.file_name) not in image_paths
+        ]
+
+    def wait_for_images(self):
+        if self._fetch_executor is not None:
+            self._fetch_executor.shutdown(wait=True)
+            self._fetch_executor = None
+        self.image_processor.wait()
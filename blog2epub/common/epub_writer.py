@@ -0,0 +1,100 @@
+import copy
+import struct
+import zipfile
+
+from ebooklib.epub import EpubBook, EpubItem, EpubNav, EpubNcx, EpubWriter  # type: ignore
+
+# These are compressed already, deflating them again only costs time
+STORED_MEDIA_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+
+
+class EpubFile(EpubItem):
+    """Epub item with content kept on disk, which is read only when writing the archive."""
+
+    def __init__(self, uid: str, file_name: str, media_type: str, source_path: str):
+        super().__init__(uid=uid, file_name=file_name, media_type=media_type)
+        self.source_path = source_path
+
+    def get_content(self, default=None):
+        with open(self.source_path, "rb") as f:
+            return f.read()
+
+
+def copy_raw_entry(source: zipfile.ZipFile, target: zipfile.ZipFile, name: str):
+    """Copy already compressed zip entry without decompressing and compressing it again.
+    zipfile has no public api for this, so local header is written by hand."""
+    info = source.getinfo(name)
+    source.fp.seek(info.header_offset)  # type: ignore
+    header = source.fp.read(zipfile.sizeFileHeader)  # type: ignore
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    source.fp.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)  # type: ignore
+    target_info = copy.copy(info)
+    target_info.flag_bits &= ~0x08  # sizes and crc are known, so there is no data descriptor
+    target_info.header_offset = target.fp.tell()  # type: ignore
+    target.fp.write(target_info.FileHeader())  # type: ignore
+    remaining = info.compress_size
+    while remaining > 0:
+        chunk = source.fp.read(min(remaining, 1024 * 1024))  # type: ignore
+        target.fp.write(chunk)  # type: ignore
+        remaining -= len(chunk)
+    target.start_dir = target.fp.tell()  # type: ignore
+    target.filelist.append(target_info)
+    target.NameToInfo[target_info.filename] = target_info
+    target._didModify = True  # type: ignore
+
+
+class StreamingEpubWriter(EpubWriter):
+    """EpubWriter which copies EpubFile items straight from disk into the zip, so peak memory
+    does not depend on the number and size of images."""
+
+    def __init__(
+        self,
+        name: str,
+        book: EpubBook,
+        options: dict | None = None,
+        previous: zipfile.ZipFile | None = None,
+        reused: set[str] | None = None,
+    ):
+        super().__init__(name, book, options)
+        self.previous = previous
+        self.reused = reused or set()
+
+    def get_entry_name(self, item: EpubItem) -> str:
+        if isinstance(item, EpubNcx | EpubNav) or item.manifest:
+            return f"{self.book.FOLDER_NAME}/{item.file_name}"
+        return item.file_name
+
+    def _is_reused(self, item: EpubItem) -> bool:
+        return self.previous is not None and self.get_entry_name(item) in self.reused
+
+    def _write_files(self, files: list[EpubFile]):
+        for item in files:
+            compress_type = zipfile.ZIP_STORED if item.media_type in STORED_MEDIA_TYPES else zipfile.ZIP_DEFLATED
+            self.out.write(item.source_path, f"{self.book.FOLDER_NAME}/{item.file_name}", compress_type=compress_type)
+
+    def _write_items(self):
+        items = self.book.items
+        reused = [item for item in items if self._is_reused(item)]
+        reused_ids = {id(item) for item in reused}
+        files = [item for item in items if isinstance(item, EpubFile) and id(item) not in reused_ids]
+        self.book.items = [item for item in items if not isinstance(item, EpubFile) and id(item) not in reused_ids]
+        try:
+            super()._write_items()
+        finally:
+            self.book.items = items
+        for item in reused:
+            copy_raw_entry(self.previous, self.out, self.get_entry_name(item))  # type: ignore
+        self._write_files(files)
+
+
+def write_epub(
+    file_name: str,
+    book: EpubBook,
+    options: dict | None = None,
+    previous: zipfile.ZipFile | None = None,
+    reused: set[str] | None = None,
+):
+    """Write epub - entries listed in reused are copied raw from previous build."""
+    writer = StreamingEpubWriter(file_name, book, options, previous=previous, reused=reused)
+    writer.process()
+    writer.write()
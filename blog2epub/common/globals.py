@@ -1 +1,3 @@
 VERSION = "1.5.0_RC2"
+
+VOLUME_SPLIT_OPTIONS = ["articles", "size", "year", "month"]
@@ -0,0 +1,356 @@
+import functools
+import io
+import math
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from PIL import Image
+
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.models.configuration import ConfigurationModel
+from blog2epub.models.events import ImageProcessedEvent
+from blog2epub.models.images import ImageProfileModel, ImageResultModel, ImageTaskModel
+
+MAX_DECODED_PIXELS = Image.MAX_IMAGE_PIXELS or 89478485
+PASSTHROUGH_FORMATS = ("JPEG", "PNG", "GIF")
+MIN_BUDGET_IMAGE_SIZE = 64
+LUMINANCE_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+TILE_SIZE = 120
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """Temporary path to write to - moved into place only when writing succeeded, so other threads and
+    processes never see partially written file under the final name."""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    finally:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+
+def has_transparency(picture: Image.Image) -> bool:
+    if picture.mode in ("RGBA", "LA", "PA"):
+        return bool(np.asarray(picture.getchannel("A")).min() < 255)
+    transparency = picture.info.get("transparency", None)
+    if transparency is None:
+        return False
+    if picture.mode == "P":
+        indices = np.asarray(picture)
+        if isinstance(transparency, bytes):
+            palette_alpha = np.full(256, 255, dtype=np.uint8)
+            palette_alpha[: len(transparency)] = np.frombuffer(transparency, dtype=np.uint8)[:256]
+            return bool((palette_alpha[indices] < 255).any())
+        return bool((indices == transparency).any())
+    return True
+
+
+def _composite_on_white(picture: Image.Image) -> np.ndarray:
+    rgba = np.asarray(picture.convert("RGBA"), dtype=np.float32)
+    alpha = rgba[..., 3:4] / 255.0
+    return rgba[..., :3] * alpha + 255.0 * (1.0 - alpha)
+
+
+def flatten_alpha(picture: Image.Image) -> Image.Image:
+    """Put transparent picture on white background."""
+    return Image.fromarray(np.rint(_composite_on_white(picture)).astype(np.uint8))
+
+
+def to_eink_grayscale(
+    picture: Image.Image, contrast: float = 1.0, levels: int = 0, dither: bool = False
+) -> Image.Image:
+    """Grayscale profile for e-ink readers: luminance, optional contrast curve and 16 (or other) levels of gray."""
+    if picture.mode == "L":
+        gray = np.asarray(picture, dtype=np.float32)
+    elif has_transparency(picture):
+        gray = _composite_on_white(picture) @ LUMINANCE_WEIGHTS
+    else:
+        gray = np.asarray(picture.convert("RGB"), dtype=np.float32) @ LUMINANCE_WEIGHTS
+    if contrast != 1.0:
+        gray = (gray - 127.5) * contrast + 127.5
+    gray_picture = Image.fromarray(np.rint(np.clip(gray, 0, 255)).astype(np.uint8))
+    if levels < 2:
+        return gray_picture
+    if dither:
+        palette = Image.new("P", (1, 1))
+        palette.putpalette([round(i * 255 / (levels - 1)) for i in range(levels) for _ in range(3)])
+        return gray_picture.convert("RGB").quantize(palette=palette, dither=Image.Dither.FLOYDSTEINBERG).convert("L")
+    step = 255 / (levels - 1)
+    quantized = np.rint(np.rint(np.asarray(gray_picture, dtype=np.float32) / step) * step)
+    return Image.fromarray(quantized.astype(np.uint8))
+
+
+def get_target_size(image_size: tuple[int, int], max_size: tuple[int, int]) -> tuple[int, int]:
+    """Size of image after fitting it into max_size (never upscaled)."""
+    scale = min(max_size[0] / image_size[0], max_size[1] / image_size[1], 1)
+    return max(1, round(image_size[0] * scale)), max(1, round(image_size[1] * scale))
+
+
+def reduced_decode(picture: Image.Image, max_size: tuple[int, int]) -> Image.Image:
+    """Pick the cheapest decode which still covers max_size: JPEG is decoded at 1/2, 1/4 or 1/8 scale,
+    other formats are reduced by integer factor before resampling."""
+    target_size = get_target_size(picture.size, max_size)
+    if target_size == picture.size:
+        return picture
+    if picture.format == "JPEG":
+        picture.draft(None, target_size)
+    if picture.size[0] * picture.size[1] > MAX_DECODED_PIXELS:
+        raise Image.DecompressionBombError(
+            f"Image size ({picture.size[0]}x{picture.size[1]}) exceeds limit of {MAX_DECODED_PIXELS} pixels"
+        )
+    factor = min(picture.size[0] // target_size[0], picture.size[1] // target_size[1])
+    if factor >= 2 and picture.mode in ("RGB", "RGBA", "L", "LA"):
+        picture = picture.reduce(factor)
+    return picture
+
+
+def save_tile(source: str, tile_path: str, tile_size: int = TILE_SIZE) -> bool:
+    """Save square, center cropped cover tile. Pictures smaller than the tile are not used on cover, so
+    for them tile is not saved and False is returned."""
+    with Image.open(source) as original:
+        width, height = original.size
+        if width < tile_size or height < tile_size:
+            return False
+        shorter = min(width, height)
+        picture = reduced_decode(
+            original, (math.ceil(width * tile_size / shorter), math.ceil(height * tile_size / shorter))
+        )
+        width, height = picture.size
+        shorter = min(width, height)
+        left, top = (width - shorter) // 2, (height - shorter) // 2
+        picture = picture.crop((left, top, left + shorter, top + shorter))
+        picture = picture.resize((tile_size, tile_size), Image.Resampling.LANCZOS)
+    if picture.mode not in ("RGB", "L"):
+        if has_transparency(picture):
+            picture = flatten_alpha(picture)
+        picture = picture.convert("RGB")
+    with atomic_path(tile_path) as temp_path:
+        picture.save(temp_path, format="JPEG", quality=90)
+    return True
+
+
+def get_image_profile(configuration: ConfigurationModel) -> ImageProfileModel:
+    return ImageProfileModel(
+        size=configuration.images_size,
+        quality=configuration.images_quality,
+        passthrough_bytes=configuration.images_passthrough_bytes,
+        grayscale=configuration.images_bw,
+        contrast=configuration.images_bw_contrast,
+        levels=configuration.images_bw_levels,
+        dither=configuration.images_bw_dither,
+    )
+
+
+def get_variant_file_name(original_fn: str, profile: ImageProfileModel) -> str:
+    """Processed variant is keyed by original content hash and image profile (size, quality and color mode)."""
+    content_hash = os.path.splitext(os.path.basename(original_fn))[0]
+    return f"{content_hash}_{profile.variant_key}.jpg"
+
+
+def publish_image(variant_fn: str, destination: str):
+    """Expose processed variant under the name used in the book - hard link if possible, copy otherwise."""
+    if os.path.isfile(destination):
+        if os.path.samefile(variant_fn, destination):
+            return
+        os.remove(destination)
+    try:
+        os.link(variant_fn, destination)
+    except OSError:
+        with atomic_path(destination) as temp_path:
+            shutil.copyfile(variant_fn, temp_path)
+
+
+def can_pass_through(picture: Image.Image, file_size: int, profile: ImageProfileModel) -> bool:
+    """Original can be used as it is, when it already fits target dimensions, format and size in bytes."""
+    return (
+        file_size <= profile.passthrough_bytes
+        and picture.format in PASSTHROUGH_FORMATS
+        and picture.size[0] <= profile.size[0]
+        and picture.size[1] <= profile.size[1]
+        and (picture.format != "JPEG" or picture.mode in ("RGB", "L"))
+        and (not profile.grayscale or (picture.mode == "L" and profile.levels < 2))
+    )
+
+
+def process_image(task: ImageTaskModel) -> ImageResultModel:
+    """Resize and convert original to JPEG variant. Module level function, so it can be used in process pool."""
+    result = ImageResultModel(url=task.url, destination=task.destination)
+    start = time.perf_counter()
+    try:
+        result.bytes_in = os.path.getsize(task.original)
+        with Image.open(task.original) as original:
+            result.passthrough = can_pass_through(original, result.bytes_in, task.profile)
+        if result.passthrough:
+            publish_image(task.original, task.variant)
+        else:
+            _encode_image(task)
+        publish_image(task.variant, task.destination)
+        result.bytes_out = os.path.getsize(task.destination)
+        if task.tile is not None and not os.path.isfile(task.tile):
+            save_tile(task.variant, task.tile)
+        result.success = True
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        result.error = str(e)
+    result.processing_time = time.perf_counter() - start
+    return result
+
+
+def _encode_image(task: ImageTaskModel):
+    profile = task.profile
+    with Image.open(task.original) as original:
+        picture = reduced_decode(original, profile.size)
+        if picture.size[0] > profile.size[0] or picture.size[1] > profile.size[1]:
+            picture.thumbnail(profile.size, Image.Resampling.LANCZOS, reducing_gap=None)
+        if profile.grayscale:
+            picture = to_eink_grayscale(
+                picture, contrast=profile.contrast, levels=profile.levels, dither=profile.dither
+            )
+        elif picture.mode != "RGB":
+            if has_transparency(picture):
+                picture = flatten_alpha(picture)
+            picture = picture.convert("RGB")
+        with atomic_path(task.variant) as temp_path:
+            picture.save(temp_path, format="JPEG", quality=profile.quality)
+
+
+def _encode_jpeg(picture: Image.Image, quality: int) -> bytes:
+    output = io.BytesIO()
+    picture.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+def encode_to_budget(source: str, destination: str, max_bytes: int, quality: int, min_quality: int = 10) -> int:
+    """Binary search for the highest JPEG quality fitting into max_bytes, downscale picture if even
+    the lowest quality is too large. Returns size of written file."""
+    with Image.open(source) as original:
+        picture = original.copy()
+    if picture.mode not in ("RGB", "L"):
+        if has_transparency(picture):
+            picture = flatten_alpha(picture)
+        picture = picture.convert("RGB")
+    best = None
+    while True:
+        low, high = min_quality, quality
+        while low <= high:
+            middle = (low + high) // 2
+            encoded = _encode_jpeg(picture, middle)
+            if len(encoded) <= max_bytes:
+                best = encoded
+                low = middle + 1
+            else:
+                high = middle - 1
+        if best is not None or min(picture.size) <= MIN_BUDGET_IMAGE_SIZE:
+            break
+        picture = picture.resize(
+            (max(1, int(picture.size[0] * 0.75)), max(1, int(picture.size[1] * 0.75))), Image.Resampling.LANCZOS
+        )
+    if best is None:
+        best = _encode_jpeg(picture, min_quality)
+    with open(destination, "wb") as f:
+        f.write(best)
+    return len(best)
+
+
+class ImageProcessor:
+    """Image post-processing stage, which runs decode, resize and encode in thread or process pool."""
+
+    def __init__(self, interface: EmptyInterface, workers: int = 0, pool: str = "thread", max_pending: int = 0):
+        self.interface = interface
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = pool
+        self.results: list[ImageResultModel] = []
+        self._executor: Executor | None = None
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # executor's queue is unbounded, so number of submitted, but not processed images is limited here
+        self._slots = threading.Semaphore(max_pending or self.workers * 4)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="blog2epub_images")
+        return self._executor
+
+    def is_pending(self, destination: str) -> bool:
+        with self._lock:
+            return destination in self._pending
+
+    def get_pending(self, destination: str) -> Future | None:
+        with self._lock:
+            return self._pending.get(destination)
+
+    def submit(self, task: ImageTaskModel) -> Future:
+        """Blocks when too many images are waiting for processing, so fetching doesn't run far ahead of it."""
+        with self._lock:
+            if task.destination in self._pending:
+                return self._pending[task.destination]
+        self._slots.acquire()
+        with self._lock:
+            if task.destination in self._pending:
+                self._slots.release()
+                return self._pending[task.destination]
+            try:
+                future = self._get_executor().submit(process_image, task)
+            except Exception:
+                self._slots.release()
+                raise
+            self._pending[task.destination] = future
+        future.add_done_callback(functools.partial(self._on_done, task.destination))
+        return future
+
+    def _on_done(self, destination: str, future: Future):
+        try:
+            result = future.result()
+        except Exception as e:
+            self.interface.print(f"Image processing failed: {e}")
+            return
+        finally:
+            # pending entry is removed also when processing raised, so it's not waited for again
+            with self._lock:
+                self._pending.pop(destination, None)
+            self._slots.release()
+        with self._lock:
+            self.results.append(result)
+        self.interface.event(
+            ImageProcessedEvent(
+                url=result.url,
+                bytes_in=result.bytes_in,
+                bytes_out=result.bytes_out,
+                ms=result.processing_time * 1000,
+                success=result.success,
+            )
+        )
+        if not result.success:
+            self.interface.print(f"Cannot process image {result.url} - {result.error}")
+
+    def wait(self):
+        """Wait until all submitted images are processed and report processing times."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        processed = [r for r in self.results if r.success]
+        if processed:
+            total_time = sum(r.processing_time for r in processed)
+            slowest = max(processed, key=lambda r: r.processing_time)
+            self.interface.print(
+                f"Processed {len(processed)} images in {total_time:.2f}s "
+                + f"(avg: {total_time / len(processed) * 1000:.0f}ms, "
+                + f"slowest: {slowest.processing_time * 1000:.0f}ms {slowest.url})"
+            )
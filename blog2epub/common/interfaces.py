@@ -1,9 +1,38 @@
 import sys
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from blog2epub.common.metrics import Metrics
+    from blog2epub.models.events import EventModel
+
+_metrics_lock = threading.Lock()
 
 
 class EmptyInterface:
     """Empty interface for script output."""
 
+    _metrics: "Metrics | None" = None
+
+    def __init__(self, metrics: "Metrics | None" = None):
+        self._metrics = metrics
+
+    @property
+    def metrics(self) -> "Metrics":
+        """Created on first use, so subclasses which don't call super().__init__() have it too."""
+        if self._metrics is None:
+            with _metrics_lock:
+                if self._metrics is None:
+                    # imported here, so CLI can define its interface without loading pydantic
+                    from blog2epub.common.metrics import Metrics
+
+                    self._metrics = Metrics()
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: "Metrics"):
+        self._metrics = metrics
+
     def delete_line(self):
         sys.stdout.write("\033[K")
 
@@ -12,3 +41,7 @@ class EmptyInterface:
 
     def exception(self, **kwargs):
         print(kwargs)
+
+    def event(self, event: "EventModel"):
+        """Structured progress event, counted in metrics. Text output is still done with print."""
+        self.metrics.record(event)
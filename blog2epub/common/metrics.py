@@ -0,0 +1,75 @@
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any, TextIO
+
+from blog2epub.models.events import (
+    ArticleParsedEvent,
+    BookWrittenEvent,
+    EventModel,
+    ImageProcessedEvent,
+    PageFetchedEvent,
+)
+
+
+class Metrics:
+    """Cumulative counters of progress events, optionally written one JSON per line to sink file."""
+
+    def __init__(self, sink_path: str | None = None):
+        self.sink_path = sink_path
+        self.counters: dict[str, float] = defaultdict(float)
+        self._sink: TextIO | None = None
+        # events come from crawl pipeline and image processing threads
+        self._lock = threading.Lock()
+
+    def _count(self, event: EventModel):
+        self.counters[f"{event.event}.count"] += 1
+        if isinstance(event, PageFetchedEvent | ArticleParsedEvent):
+            self.counters[f"{event.event}.ms"] += event.ms
+            if event.cache_hit:
+                self.counters[f"{event.event}.cache_hits"] += 1
+        if isinstance(event, PageFetchedEvent | BookWrittenEvent):
+            self.counters[f"{event.event}.bytes"] += event.bytes
+        if isinstance(event, BookWrittenEvent):
+            self.counters[f"{event.event}.ms"] += event.ms
+        if isinstance(event, ImageProcessedEvent):
+            self.counters[f"{event.event}.ms"] += event.ms
+            self.counters[f"{event.event}.bytes_in"] += event.bytes_in
+            self.counters[f"{event.event}.bytes_out"] += event.bytes_out
+            if not event.success:
+                self.counters[f"{event.event}.errors"] += 1
+
+    def record(self, event: EventModel):
+        with self._lock:
+            self._count(event)
+            if self.sink_path is not None:
+                if self._sink is None:
+                    self._sink = open(self.sink_path, "a", encoding="utf-8")
+                self._sink.write(event.model_dump_json() + "\n")
+                self._sink.flush()
+
+    def wrap_stage(self, name: str, function: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """Hook for measuring pipeline stages, see Profiler."""
+        return function
+
+    def get_counters(self) -> dict[str, float]:
+        with self._lock:
+            return dict(sorted(self.counters.items()))
+
+    def get_summary(self) -> str:
+        counters = self.get_counters()
+        lines = []
+        for event in ("page_fetched", "article_parsed", "image_processed", "book_written"):
+            count = int(counters.get(f"{event}.count", 0))
+            if count:
+                line = f"{event}: {count}, {counters.get(f'{event}.ms', 0) / count:.1f} ms avg"
+                if f"{event}.cache_hits" in counters:
+                    line += f", {int(counters[f'{event}.cache_hits'])} from cache"
+                lines.append(line)
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            if self._sink is not None:
+                self._sink.close()
+                self._sink: TextIO | None = None
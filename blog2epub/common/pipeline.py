@@ -0,0 +1,126 @@
+import threading
+from collections.abc import Callable, Iterable
+from queue import Queue
+from typing import Any
+
+from blog2epub.common.interfaces import EmptyInterface
+
+_END = object()
+
+
+class PipelineStage:
+    """Function applied to every item by its own pool of workers. Returning None drops the item."""
+
+    def __init__(self, name: str, function: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.function = function
+        self.workers = max(1, workers)
+
+
+class Pipeline:
+    """Stages connected with bounded queues, so network waits and cpu work overlap, while number of items
+    in flight (and memory) is limited. Results are emitted in the order of input items."""
+
+    def __init__(
+        self,
+        stages: list[PipelineStage],
+        interface: EmptyInterface,
+        queue_size: int = 16,
+        max_in_flight: int = 0,
+    ):
+        self.stages = stages
+        self.interface = interface
+        self.queue_size = max(1, queue_size)
+        # items fed, but not emitted (or dropped) yet - e.g. so no more pages are fetched than articles are needed
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.Semaphore(self.get_in_flight_limit())
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_in_flight_limit(self) -> int:
+        """Items in flight are always bounded - by what fits into the queues and workers, or by max_in_flight
+        when it's smaller. Otherwise results waiting for one slow item would pile up in emitter's buffer."""
+        limit = self.queue_size * (len(self.stages) + 1) + sum(stage.workers for stage in self.stages)
+        if self.max_in_flight > 0:
+            return min(limit, self.max_in_flight)
+        return limit
+
+    def _wait_for_slot(self) -> bool:
+        while not self._stop.is_set():
+            if self._in_flight.acquire(timeout=0.1):
+                return not self._stop.is_set()
+        return False
+
+    def _feed(self, items: Iterable, output: Queue, workers: int):
+        for index, item in enumerate(items):
+            if not self._wait_for_slot():
+                break
+            output.put((index, item))
+        for _ in range(workers):
+            output.put(_END)
+
+    def _work(self, stage: PipelineStage, source: Queue, output: Queue, finished: list, next_workers: int):
+        function = self.interface.metrics.wrap_stage(stage.name, stage.function)
+        while True:
+            entry = source.get()
+            if entry is _END:
+                break
+            index, item = entry
+            result = None
+            if item is not None and not self._stop.is_set():
+                try:
+                    result = function(item)
+                except Exception as e:
+                    self.interface.print(f"Pipeline stage {stage.name} failed: {e}")
+            # dropped items are still passed on, so emitter knows it doesn't have to wait for them
+            output.put((index, result))
+        with finished[0]:
+            finished[1] += 1
+            last_worker = finished[1] == stage.workers
+        if last_worker:
+            for _ in range(next_workers):
+                output.put(_END)
+
+    def run(self, items: Iterable, emit: Callable[[Any], bool]):
+        """Emit results in order until items are exhausted or emit returns False."""
+        self._stop.clear()
+        self._in_flight = threading.Semaphore(self.get_in_flight_limit())
+        queues: list[Queue[Any]] = [Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [
+            threading.Thread(
+                target=self._feed, args=(items, queues[0], self.stages[0].workers), name="pipeline_feed", daemon=True
+            )
+        ]
+        for number, stage in enumerate(self.stages):
+            next_workers = self.stages[number + 1].workers if number + 1 < len(self.stages) else 1
+            finished = [threading.Lock(), 0]
+            for worker in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(stage, queues[number], queues[number + 1], finished, next_workers),
+                        name=f"pipeline_{stage.name}_{worker}",
+                        daemon=True,
+                    )
+                )
+        for thread in threads:
+            thread.start()
+        buffer: dict[int, Any] = {}
+        next_index = 0
+        while True:
+            # after stop, queues are still drained, so no worker stays blocked on full queue
+            entry = queues[-1].get()
+            if entry is _END:
+                break
+            index, result = entry
+            buffer[index] = result
+            while next_index in buffer:
+                result = buffer.pop(next_index)
+                next_index += 1
+                if result is not None and not self._stop.is_set() and emit(result) is False:
+                    self._stop.set()
+                self._in_flight.release()
+        for thread in threads:
+            thread.join()
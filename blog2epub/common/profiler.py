@@ -0,0 +1,127 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+from blog2epub.common.metrics import Metrics
+from blog2epub.models.events import (
+    ArticleParsedEvent,
+    BookWrittenEvent,
+    EventModel,
+    ImageProcessedEvent,
+    PageFetchedEvent,
+)
+
+
+class Profiler(Metrics):
+    """Metrics which also keep wall and cpu time of every pipeline stage, timings of every article and image,
+    and cProfile of the whole run, so slow runs can be analysed without external profilers."""
+
+    def __init__(self, dump_path: str, top: int = 10, sink_path: str | None = None):
+        super().__init__(sink_path=sink_path)
+        self.dump_path = dump_path
+        self.top = top
+        self.stages: dict[str, list[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+        self.fetches: dict[str, float] = {}
+        self.articles: list[ArticleParsedEvent] = []
+        self.images: list[ImageProcessedEvent] = []
+        self.books: list[BookWrittenEvent] = []
+        self._profiles: list[cProfile.Profile] = []
+        self._thread_profiles = threading.local()
+        self._started: tuple[float, float] | None = None
+        self._elapsed = (0.0, 0.0)
+
+    def record(self, event: EventModel):
+        super().record(event)
+        with self._lock:
+            if isinstance(event, PageFetchedEvent):
+                self.fetches[event.url] = event.ms
+            elif isinstance(event, ArticleParsedEvent):
+                self.articles.append(event)
+            elif isinstance(event, ImageProcessedEvent):
+                self.images.append(event)
+            elif isinstance(event, BookWrittenEvent):
+                self.books.append(event)
+
+    def start(self):
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        self._started = (time.perf_counter(), time.process_time())
+        profile.enable()
+
+    def stop(self):
+        self._profiles[0].disable()
+        if self._started is not None:
+            self._elapsed = (time.perf_counter() - self._started[0], time.process_time() - self._started[1])
+
+    def _get_thread_profile(self) -> cProfile.Profile | None:
+        # since python 3.12 cProfile is based on sys.monitoring and already covers all threads
+        if sys.version_info >= (3, 12) or threading.current_thread() is threading.main_thread():
+            return None
+        profile = getattr(self._thread_profiles, "profile", None)
+        if profile is None:
+            profile = cProfile.Profile()
+            self._thread_profiles.profile = profile
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+
+    def wrap_stage(self, name: str, function: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        def profiled(item: Any) -> Any:
+            profile = self._get_thread_profile() if self._profiles else None
+            wall, cpu = time.perf_counter(), time.thread_time()
+            if profile is not None:
+                profile.enable()
+            try:
+                return function(item)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                with self._lock:
+                    stage = self.stages[name]
+                    stage[0] += time.perf_counter() - wall
+                    stage[1] += time.thread_time() - cpu
+                    stage[2] += 1
+
+        return profiled
+
+    def dump(self) -> pstats.Stats | None:
+        profiles = [profile for profile in self._profiles if profile.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(self.dump_path)
+        return stats
+
+    def get_report(self) -> str:
+        lines = [f"Total: {self._elapsed[0]:.2f} s wall, {self._elapsed[1]:.2f} s cpu", "Stages (wall / cpu):"]
+        for name, (wall, cpu, count) in self.stages.items():
+            lines.append(f"  {name}: {wall:.2f} s / {cpu:.2f} s, {int(count)} items")
+        for book in self.books:
+            lines.append(f"  write epub: {book.ms / 1000:.2f} s, {book.articles} articles, {book.file_name}")
+        lines.append(f"Slowest {self.top} articles (fetch + parse, parse cpu):")
+        articles = sorted(self.articles, key=lambda a: self.fetches.get(a.url, 0) + a.ms, reverse=True)
+        for article in articles[: self.top]:
+            fetch_ms = self.fetches.get(article.url, 0)
+            lines.append(
+                f"  {fetch_ms + article.ms:.0f} ms ({fetch_ms:.0f} + {article.ms:.0f}, cpu {article.cpu_ms:.0f})"
+                + f"{' cached' if article.cache_hit else ''} {article.url}"
+            )
+        lines.append(f"Slowest {self.top} images (processing):")
+        for image in sorted(self.images, key=lambda i: i.ms, reverse=True)[: self.top]:
+            lines.append(f"  {image.ms:.0f} ms ({image.bytes_in} -> {image.bytes_out} bytes) {image.url}")
+        stats = self.dump()
+        if stats is not None:
+            output = io.StringIO()
+            stats.stream = output  # type: ignore
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top * 2)
+            lines.append(f"cProfile dump: {self.dump_path}")
+            lines.append(output.getvalue().strip())
+        return "\n".join(lines)
@@ -0,0 +1,59 @@
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import requests
+
+if TYPE_CHECKING:
+    from blog2epub.common.warc import WarcWriter
+
+
+class ConnectionLimiter:
+    """Global and per host limit of concurrent requests, shared by all crawls running in one process."""
+
+    def __init__(self, max_connections: int = 16, max_per_host: int = 2):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self._connections = threading.BoundedSemaphore(max_connections)
+        self._hosts: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _get_host_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._hosts[host]
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        # host slot is taken first, so waiting for busy host doesn't block global slot
+        with self._get_host_semaphore(urlparse(url).netloc), self._connections:
+            yield
+
+
+class ThrottledSession(requests.Session):
+    """Requests session which respects connection limiter, counts downloaded bytes and optionally records
+    all responses to WARC file."""
+
+    def __init__(self, limiter: ConnectionLimiter | None = None, recorder: "WarcWriter | None" = None):
+        super().__init__()
+        self.limiter = limiter
+        self.recorder = recorder
+        self.bytes_downloaded = 0
+        self.requests_count = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        if self.limiter is None:
+            response = super().request(method, url, *args, **kwargs)
+        else:
+            with self.limiter.limit(url):
+                response = super().request(method, url, *args, **kwargs)
+        with self._lock:
+            self.bytes_downloaded += len(response.content or b"")
+            self.requests_count += 1
+        if self.recorder is not None:
+            self.recorder.record(response)
+        return response
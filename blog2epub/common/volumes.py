@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from blog2epub.common.book import Book
+from blog2epub.common.book_cache import BookCache
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.models.book import ArticleModel, BookModel, ImageModel
+from blog2epub.models.configuration import ConfigurationModel
+
+
+def _get_article_size(article: ArticleModel, book_data: BookModel) -> int:
+    article_size = len(article.content or "") + len(article.comments or "")
+    for image in article.images:
+        image_path = os.path.join(book_data.dirs.images, image.file_name)
+        if os.path.isfile(image_path):
+            article_size += os.path.getsize(image_path)
+    return article_size
+
+
+def _get_period(article: ArticleModel, split_by: str) -> str | None:
+    if article.date is None:
+        return None
+    if split_by == "year":
+        return article.date.strftime("%Y")
+    return article.date.strftime("%Y.%m")
+
+
+def split_into_volumes(
+    articles: list[ArticleModel],
+    book_data: BookModel,
+    split_by: str,
+    volume_size: int = 0,
+) -> list[list[ArticleModel]]:
+    """Split articles by count, size in MB or calendar period (year or month), keeping their order."""
+    volumes: list[list[ArticleModel]] = []
+    current_volume: list[ArticleModel] = []
+    current_size = 0
+    current_period = None
+    for article in articles:
+        new_volume = False
+        if split_by == "articles" and volume_size > 0:
+            new_volume = len(current_volume) >= volume_size
+        elif split_by == "size" and volume_size > 0:
+            article_size = _get_article_size(article, book_data)
+            new_volume = current_size + article_size > volume_size * 1024 * 1024
+            current_size += article_size
+        elif split_by in ("year", "month"):
+            period = _get_period(article, split_by)
+            new_volume = period is not None and current_period is not None and period != current_period
+            current_period = period or current_period
+        if new_volume and current_volume:
+            volumes.append(current_volume)
+            current_volume = []
+            if split_by == "size":
+                current_size = _get_article_size(article, book_data)
+        current_volume.append(article)
+    if current_volume:
+        volumes.append(current_volume)
+    return volumes
+
+
+def _get_volume_book_data(book_data: BookModel, articles: list[ArticleModel]) -> BookModel:
+    """Volume contains only images referenced by its articles."""
+    images: list[ImageModel] = []
+    for article in articles:
+        for image in article.images:
+            if image not in images:
+                images.append(image)
+    return book_data.model_copy(update={"articles": articles, "images": images})
+
+
+def save_volumes(
+    book_data: BookModel,
+    configuration: ConfigurationModel,
+    interface: EmptyInterface,
+    destination_folder: str = ".",
+    platform_name: str = "",
+    articles: list[ArticleModel] | None = None,
+    cache: BookCache | None = None,
+    change_locale: bool = True,
+) -> list[Book]:
+    """Split book into volumes and write them concurrently."""
+    if articles is None:
+        articles = book_data.articles
+    volumes = split_into_volumes(articles, book_data, configuration.volume_split, configuration.volume_size)
+    interface.print(f"Writing {len(volumes)} volumes.")
+    books = [
+        Book(
+            book_data=_get_volume_book_data(book_data, volume_articles),
+            configuration=configuration,
+            interface=interface,
+            destination_folder=destination_folder,
+            platform_name=platform_name,
+            volume=number if len(volumes) > 1 else None,
+            cache=cache,
+            change_locale=change_locale,
+        )
+        for number, volume_articles in enumerate(volumes, start=1)
+    ]
+    with ThreadPoolExecutor(max_workers=min(len(books), os.cpu_count() or 1) or 1) as executor:
+        for _ in executor.map(lambda book: book.save(), books):
+            pass
+    return books
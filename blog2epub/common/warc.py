@@ -0,0 +1,251 @@
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from blog2epub.common.globals import VERSION
+from blog2epub.common.throttle import ConnectionLimiter, ThrottledSession
+
+WARC_VERSION = b"WARC/1.1"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# body is stored decoded, so these would not describe it anymore
+SKIPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+READ_CHUNK_SIZE = 1024 * 1024
+MAX_INDEXED_HEADER = 64 * 1024
+
+
+def get_request_url(method: str, url: str) -> str:
+    """Normalised url, the same for recorded and replayed request."""
+    return str(requests.Request(method, url).prepare().url)
+
+
+def _to_str(value: str | bytes | None) -> str:
+    """Parts of prepared request can be str or bytes, WARC headers are text."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return value or ""
+
+
+def _get_warc_record(warc_type: str, headers: dict[str, str], block: bytes) -> bytes:
+    warc_headers = {
+        "WARC-Type": warc_type,
+        "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+        "WARC-Date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        **headers,
+        "Content-Length": str(len(block)),
+    }
+    header_lines = b"".join(f"{name}: {value}\r\n".encode() for name, value in warc_headers.items())
+    record = WARC_VERSION + b"\r\n" + header_lines + b"\r\n" + block + b"\r\n\r\n"
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    # every record is separate gzip member, so it can be read without decompressing whole file
+    return compressor.compress(record) + compressor.flush()
+
+
+def _parse_headers(lines: list[bytes]) -> CaseInsensitiveDict:
+    headers: CaseInsensitiveDict = CaseInsensitiveDict()
+    for line in lines:
+        name, _, value = line.decode("utf-8", "replace").partition(":")
+        headers[name.strip()] = value.strip()
+    return headers
+
+
+class WarcWriter:
+    """Writes every request and response (headers included) to gzipped WARC file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _write(self, records: list[bytes]):
+        with self._lock:
+            mode = "ab" if self._started else "wb"
+            if not self._started:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                info = f"software: blog2epub {VERSION}\r\nformat: WARC File Format 1.1\r\n".encode()
+                records = [_get_warc_record("warcinfo", {"Content-Type": "application/warc-fields"}, info)] + records
+                self._started = True
+            with open(self.path, mode) as f:
+                f.write(b"".join(records))
+
+    @staticmethod
+    def _get_request_block(request: requests.PreparedRequest) -> bytes:
+        parsed = urlparse(_to_str(request.url))
+        target = parsed.path or "/"
+        if parsed.query:
+            target += f"?{parsed.query}"
+        lines = [f"{_to_str(request.method)} {target} HTTP/1.1", f"Host: {parsed.netloc}"]
+        lines += [f"{_to_str(name)}: {_to_str(value)}" for name, value in request.headers.items()]
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+        elif not isinstance(body, bytes):
+            # streamed (file or generator) bodies are not recorded
+            body = b""
+        return "\r\n".join(lines).encode() + b"\r\n\r\n" + body
+
+    @staticmethod
+    def _get_response_block(response: requests.Response) -> bytes:
+        content = response.content or b""
+        lines = [f"HTTP/1.1 {response.status_code} {response.reason or ''}".strip()]
+        lines += [f"{name}: {value}" for name, value in response.headers.items() if name.lower() not in SKIPPED_HEADERS]
+        lines.append(f"Content-Length: {len(content)}")
+        return "\r\n".join(lines).encode() + b"\r\n\r\n" + content
+
+    def record(self, response: requests.Response):
+        """Record response, together with redirects which led to it."""
+        records = []
+        for exchange in response.history + [response]:
+            response_id = f"<urn:uuid:{uuid.uuid4()}>"
+            url = str(exchange.request.url)
+            records.append(
+                _get_warc_record(
+                    "response",
+                    {
+                        "WARC-Record-ID": response_id,
+                        "WARC-Target-URI": url,
+                        "Content-Type": "application/http; msgtype=response",
+                    },
+                    self._get_response_block(exchange),
+                )
+            )
+            records.append(
+                _get_warc_record(
+                    "request",
+                    {
+                        "WARC-Target-URI": url,
+                        "WARC-Concurrent-To": response_id,
+                        "Content-Type": "application/http; msgtype=request",
+                    },
+                    self._get_request_block(exchange.request),
+                )
+            )
+        self._write(records)
+
+
+class WarcArchive:
+    """Index of responses in WARC file. Only offsets are kept in memory, records are read when requested."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: dict[tuple[str, str], int] | None = None
+        self._lock = threading.Lock()
+
+    def _iter_members(self):
+        """Yields offset and beginning of every gzip member (record) of the file."""
+        with open(self.path, "rb") as f:
+            offset = 0
+            pending = b""
+            while True:
+                decompressor = zlib.decompressobj(wbits=31)
+                start = offset
+                beginning = b""
+                while not decompressor.eof:
+                    chunk = pending or f.read(READ_CHUNK_SIZE)
+                    pending = b""
+                    if not chunk:
+                        return
+                    data = decompressor.decompress(chunk)
+                    if len(beginning) < MAX_INDEXED_HEADER:
+                        beginning += data[: MAX_INDEXED_HEADER - len(beginning)]
+                    offset += len(chunk)
+                pending = decompressor.unused_data
+                offset -= len(pending)
+                yield start, beginning
+
+    @staticmethod
+    def _split_record(record: bytes) -> tuple[CaseInsensitiveDict, bytes]:
+        header, _, block = record.partition(b"\r\n\r\n")
+        headers = _parse_headers(header.split(b"\r\n")[1:])
+        return headers, block[: int(headers.get("Content-Length", len(block)))]
+
+    def _build_index(self) -> dict[tuple[str, str], int]:
+        responses: dict[str, tuple[str, int]] = {}
+        index: dict[tuple[str, str], int] = {}
+        for offset, beginning in self._iter_members():
+            headers, block = self._split_record(beginning)
+            if headers.get("WARC-Type") == "response":
+                responses[headers["WARC-Record-ID"]] = (headers["WARC-Target-URI"], offset)
+                # responses without request record are treated as answers to GET
+                index[("GET", headers["WARC-Target-URI"])] = offset
+            elif headers.get("WARC-Type") == "request" and headers.get("WARC-Concurrent-To") in responses:
+                url, response_offset = responses[headers["WARC-Concurrent-To"]]
+                method = block.split(b" ", 1)[0].decode()
+                index[(method, url)] = response_offset
+        return index
+
+    def get_index(self) -> dict[tuple[str, str], int]:
+        with self._lock:
+            if self._index is None:
+                self._index = self._build_index()
+            return self._index
+
+    def _read_member(self, offset: int) -> bytes:
+        decompressor = zlib.decompressobj(wbits=31)
+        output = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while not decompressor.eof:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                output.append(decompressor.decompress(chunk))
+        return b"".join(output)
+
+    def get_response(self, method: str, url: str) -> requests.Response:
+        """Recorded response, or 404 if url wasn't recorded."""
+        response = requests.Response()
+        response.url = url
+        response.request = requests.Request(method, url).prepare()
+        offset = self.get_index().get((method.upper(), url))
+        if offset is None:
+            response.status_code = 404
+            response.reason = "Not Found (not recorded)"
+            response._content = b""
+            return response
+        _, block = self._split_record(self._read_member(offset))
+        header, _, content = block.partition(b"\r\n\r\n")
+        status_line, *header_lines = header.split(b"\r\n")
+        status = status_line.decode().split(" ", 2)
+        response.status_code = int(status[1])
+        response.reason = status[2] if len(status) > 2 else ""
+        response.headers = _parse_headers(header_lines)
+        response._content = content
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+class WarcReplaySession(ThrottledSession):
+    """Session which serves everything from WARC archive, without any network access."""
+
+    def __init__(self, archive: WarcArchive, limiter: ConnectionLimiter | None = None):
+        super().__init__(limiter)
+        self.archive = archive
+
+    def request(self, method, url, *args, **kwargs):
+        method = method.upper()
+        response = self.archive.get_response(method, get_request_url(method, url))
+        history = []
+        while response.status_code in REDIRECT_CODES and "Location" in response.headers and len(history) < 10:
+            history.append(response)
+            next_method = "GET" if response.status_code == 303 else method
+            location = urljoin(response.url, response.headers["Location"])
+            response = self.archive.get_response(next_method, get_request_url(next_method, location))
+        response.history = history
+        with self._lock:
+            self.bytes_downloaded += len(response.content or b"")
+            self.requests_count += 1
+        return response
+
+
+def get_session(
+    connection_limiter: ConnectionLimiter | None = None, warc_record: str = "", warc_replay: str = ""
+) -> ThrottledSession:
+    if warc_replay:
+        return WarcReplaySession(WarcArchive(warc_replay))
+    return ThrottledSession(connection_limiter, recorder=WarcWriter(warc_record) if warc_record else None)
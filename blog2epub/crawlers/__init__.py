@@ -1,10 +1,25 @@
-from blog2epub.crawlers.abstract import AbstractCrawler
-from blog2epub.crawlers.blogspot import BlogspotCrawler
-from blog2epub.crawlers.default import DefaultCrawler
-from blog2epub.crawlers.nrdblog_cmosnet import NrdblogCmosEuCrawler
-from blog2epub.crawlers.universal import UniversalCrawler
-from blog2epub.crawlers.wordpress import WordpressCrawler
-from blog2epub.crawlers.zeissikonveb import ZeissIkonVEBCrawler
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from blog2epub.crawlers.abstract import AbstractCrawler
+    from blog2epub.crawlers.blogspot import BlogspotCrawler
+    from blog2epub.crawlers.default import DefaultCrawler
+    from blog2epub.crawlers.nrdblog_cmosnet import NrdblogCmosEuCrawler
+    from blog2epub.crawlers.universal import UniversalCrawler
+    from blog2epub.crawlers.wordpress import WordpressCrawler
+    from blog2epub.crawlers.zeissikonveb import ZeissIkonVEBCrawler
+
+# importing one crawler module doesn't import all the others
+_CRAWLER_MODULES = {
+    "AbstractCrawler": "blog2epub.crawlers.abstract",
+    "BlogspotCrawler": "blog2epub.crawlers.blogspot",
+    "DefaultCrawler": "blog2epub.crawlers.default",
+    "NrdblogCmosEuCrawler": "blog2epub.crawlers.nrdblog_cmosnet",
+    "UniversalCrawler": "blog2epub.crawlers.universal",
+    "WordpressCrawler": "blog2epub.crawlers.wordpress",
+    "ZeissIkonVEBCrawler": "blog2epub.crawlers.zeissikonveb",
+}
 
 __all__ = [
     "AbstractCrawler",
@@ -15,3 +30,9 @@ __all__ = [
     "WordpressCrawler",
     "ZeissIkonVEBCrawler",
 ]
+
+
+def __getattr__(name: str):
+    if name in _CRAWLER_MODULES:
+        return getattr(importlib.import_module(_CRAWLER_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,21 @@
 import os
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from datetime import datetime
 
+from blog2epub.common.article_cache import ArticleCache
 from blog2epub.common.book import Book
+from blog2epub.common.checkpoint import CrawlCheckpoint
 from blog2epub.common.crawler import (
     prepare_file_name,
     prepare_port_and_url,
 )
 from blog2epub.common.downloader import Downloader
+from blog2epub.common.images import get_image_profile
 from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.throttle import ConnectionLimiter
 from blog2epub.crawlers.article_factory.abstract import AbstractArticleFactory
+from blog2epub.crawlers.article_factory.default import remove_images
 from blog2epub.models.book import ArticleModel, BookModel, DirModel, ImageModel
 from blog2epub.models.configuration import ConfigurationModel
 from blog2epub.models.content_patterns import ContentPatterns
@@ -25,6 +31,7 @@ class AbstractCrawler(ABC):
         end: datetime | None = None,
         file_name: str | None = None,
         cache_folder: str = "",
+        connection_limiter: ConnectionLimiter | None = None,
     ):
         super().__init__()
         self.name = "abstract crawler"
@@ -32,6 +39,7 @@ class AbstractCrawler(ABC):
         self.configuration = configuration
         self.file_name = prepare_file_name(file_name, self.url)
         self.cache_folder = cache_folder
+        self.connection_limiter = connection_limiter
         self.start = start
         self.end = end
         self.interface = interface
@@ -39,10 +47,12 @@ class AbstractCrawler(ABC):
             path=str(
                 os.path.join(
                     self.cache_folder,
-                    self.url.replace("http://", "").replace("https://", "").replace("/", "_"),
+                    self.url.replace("http://", "").replace("https://", "").replace("/", "_").replace(":", "_"),
                 )
             ),
         )
+        self.checkpoint = CrawlCheckpoint(self.dirs)
+        self.article_cache = ArticleCache(self.dirs)
         self.book: Book | None
         self.title: str = ""
         self.subtitle: str = ""
@@ -55,20 +65,36 @@ class AbstractCrawler(ABC):
         self.tags: dict = {}
         self.active = False
         self.cancelled = False
+        # called with every crawled article, returning False stops the crawl
+        self.on_article: Callable[[ArticleModel], bool] | None = None
         self.ignore_downloads: list[str] = [
             r"[http|https]+:\/\/zblogowani.pl[^\s]+",
         ]
-        self.article_factory_class = AbstractArticleFactory
+        self.article_factory_class: type[AbstractArticleFactory] = AbstractArticleFactory  # type: ignore
         self.patterns: ContentPatterns | None = None
         self.downloader = Downloader(
             dirs=self.dirs,
             url=self.url,
             interface=self.interface,
-            images_size=self.configuration.images_size,
-            images_quality=self.configuration.images_quality,
+            images_profile=get_image_profile(self.configuration),
             ignore_downloads=self.ignore_downloads,
+            images_workers=self.configuration.images_workers,
+            images_pool=self.configuration.images_pool,
+            fetch_workers=self.configuration.crawl_image_fetch_workers,
+            connection_limiter=self.connection_limiter,
+            warc_record=self.configuration.warc_record,
+            warc_replay=self.configuration.warc_replay,
         )
 
+    def remove_missing_images(self, art: ArticleModel):
+        """Images are processed in background, when processing fails the image is taken out of the article,
+        so chapter doesn't reference file missing in the book."""
+        missing = self.downloader.get_missing_images(art.images)
+        if missing:
+            art.images = [image_obj for image_obj in art.images if image_obj not in missing]
+            if art.content:
+                art.content = remove_images(art.content, missing)
+
     @abstractmethod
     def crawl(self):
         pass
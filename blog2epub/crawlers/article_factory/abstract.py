@@ -17,7 +17,7 @@ class AbstractArticleFactory(ABC):
         patterns: ContentPatterns | None,
         interface: EmptyInterface,
         dirs: DirModel,
-        language: str,
+        language: str | None,
         downloader: Downloader,
         cancelled: bool = False,
         download_callback: Callable | None = None,
@@ -13,6 +13,26 @@ from blog2epub.crawlers.article_factory.abstract import AbstractArticleFactory
 from blog2epub.models.book import ArticleModel, ImageModel
 
 
+def get_image_html(image: ImageModel) -> str:
+    image_html = (
+        '<table align="center" cellpadding="0" cellspacing="0" class="tr-caption-container" '
+        + 'style="margin-left: auto; margin-right: auto; text-align: center; background: #FFF;'
+        'box-shadow: 1px 1px 5px rgba(0, 0, 0, 0.5); padding: 8px;"><tbody>'
+    )
+    image_html += f'<tr><td style="text-align: center;"><img border="0" src="images/{image.file_name}" /></td></tr>'
+    if image.description:
+        image_html += f'<tr><td class="tr-caption" style="text-align: center;">{image.description}</td></tr>'
+    image_html += "</tbody></table>"
+    return image_html
+
+
+def remove_images(article_content: str, images_list: list[ImageModel]) -> str:
+    """Remove images inserted by article factory, e.g. when their processing failed."""
+    for image in images_list:
+        article_content = article_content.replace(get_image_html(image), "")
+    return article_content
+
+
 class DefaultArticleFactory(AbstractArticleFactory):
     def get_title(self) -> str | None:
         title = None
@@ -94,6 +114,7 @@ class DefaultArticleFactory(AbstractArticleFactory):
                     pass
                 elif pattern.xpath:
                     images_in_pattern = self.tree.xpath(pattern.xpath)
+                    candidates: list[tuple[ImageModel, object]] = []
                     for image_element in images_in_pattern:
                         try:
                             image_url = image_element.xpath("@src")[0]
@@ -102,7 +123,7 @@ class DefaultArticleFactory(AbstractArticleFactory):
                                 parent_url = image_parent.xpath("@href")[0]
                                 # Check if this potential HREF is actually image link and not a linkout to
                                 # a partner site on a logo or something
-                                if(self.downloader.resolve_image_type(parent_url) is not None):
+                                if self.downloader.resolve_image_type(parent_url) is not None:
                                     image_url = parent_url
                         except IndexError:
                             break
@@ -114,11 +135,15 @@ class DefaultArticleFactory(AbstractArticleFactory):
                         if self.download_callback:
                             if self.download_callback():
                                 break
-                        if self.downloader.download_image(image_obj):
+                        candidates.append((image_obj, image_element))
+                    # images of the pattern are fetched together, by downloader fetch workers
+                    downloaded = self.downloader.download_images([image_obj for image_obj, _ in candidates])
+                    for (image_obj, image_element), is_downloaded in zip(candidates, downloaded, strict=True):
+                        if is_downloaded:
                             self.images_list.append(image_obj)
                             self.interface.print(".", end="")
-                            if(image_element is None):
-                                self.interface.print("<--(image_element_broken: {})".format(image_url), end="")
+                            if image_element is None:
+                                self.interface.print(f"<--(image_element_broken: {image_obj.url})", end="")
                             images_html.append(tostring(image_element))
             self._remove_images(images_html=images_html, images_list=self.images_list)
             # images will be inserted back after cleaning the content
@@ -128,18 +153,7 @@ class DefaultArticleFactory(AbstractArticleFactory):
 
     def _insert_images(self, article_content: str, images_list: list[ImageModel]) -> str:
         for image in images_list:
-            image_html = (
-                '<table align="center" cellpadding="0" cellspacing="0" class="tr-caption-container" '
-                + 'style="margin-left: auto; margin-right: auto; text-align: center; background: #FFF;'
-                'box-shadow: 1px 1px 5px rgba(0, 0, 0, 0.5); padding: 8px;"><tbody>'
-            )
-            image_html += (
-                f'<tr><td style="text-align: center;"><img border="0" src="images/{image.file_name}" /></td></tr>'
-            )
-            if image.description:
-                image_html += f'<tr><td class="tr-caption" style="text-align: center;">{image.description}</td></tr>'
-            image_html += "</tbody></table>"
-            article_content = article_content.replace(f"#blog2epubimage#{image.hash}#", image_html)
+            article_content = article_content.replace(f"#blog2epubimage#{image.hash}#", get_image_html(image))
         return article_content
 
     def get_content(self) -> str:
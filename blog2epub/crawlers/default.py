@@ -2,8 +2,8 @@
 # -*- coding : utf-8 -*-
 import html
 import re
+import time
 from urllib import robotparser
-from urllib.error import URLError
 from urllib.parse import urljoin
 
 import atoma  # type: ignore
@@ -12,11 +12,15 @@ from lxml import etree
 from lxml.etree import XMLSyntaxError
 from lxml.html.soupparser import fromstring
 
-from blog2epub.common.downloader import Downloader
+from blog2epub.common.checkpoint import PAGE_EMPTY
+from blog2epub.common.globals import VERSION
+from blog2epub.common.pipeline import Pipeline, PipelineStage
 from blog2epub.crawlers.abstract import AbstractCrawler
 from blog2epub.crawlers.article_factory.default import DefaultArticleFactory
 from blog2epub.models.book import ArticleModel, BookModel, DirModel, ImageModel
+from blog2epub.models.checkpoint import CrawlStateModel
 from blog2epub.models.content_patterns import ContentPatterns, Pattern
+from blog2epub.models.events import ArticleParsedEvent
 
 
 class DefaultCrawler(AbstractCrawler):
@@ -127,14 +131,6 @@ class DefaultCrawler(AbstractCrawler):
                 ),
             ],
         )
-        self.downloader = Downloader(
-            dirs=self.dirs,
-            url=self.url,
-            interface=self.interface,
-            images_size=self.configuration.images_size,
-            images_quality=self.configuration.images_quality,
-            ignore_downloads=self.ignore_downloads,
-        )
 
     def get_book_data(self) -> BookModel:
         """This is temporary solution - crawler should use data models as default data storage."""
@@ -231,11 +227,18 @@ class DefaultCrawler(AbstractCrawler):
             return True
         return False
 
+    def _get_articles_left(self) -> int:
+        """Articles still needed to reach the limit, 0 when there's no limit."""
+        if self.configuration.limit and self.configuration.limit.isdigit():
+            return max(1, int(self.configuration.limit) - len(self.articles))
+        return 0
+
     def _get_sitemap_url(self) -> str:
         self.interface.print("Analysing sitemaps", end="")
         robots_parser = robotparser.RobotFileParser()
         robots_parser.set_url(urljoin(self.url, "/robots.txt"))
-        robots_parser.read()
+        robots = self.downloader.get(urljoin(self.url, "/robots.txt"))
+        robots_parser.parse(robots.text.splitlines() if robots.status_code == 200 else [])
         if hasattr(robots_parser, "sitemaps") and robots_parser.sitemaps:
             sitemap_url = robots_parser.sitemaps[0]
         elif self.configuration.engine == "wordpress":
@@ -245,7 +248,7 @@ class DefaultCrawler(AbstractCrawler):
         return sitemap_url
 
     def _get_pages_from_sub_sitemap(self, sitemap_url: str) -> list[str]:
-        sub_sitemap = requests.get(sitemap_url)
+        sub_sitemap = self.downloader.get(sitemap_url)
         pages = []
         for element in etree.fromstring(sub_sitemap.content):  # type: ignore
             page_url = element.getchildren()[0].text  # type: ignore
@@ -305,7 +308,7 @@ class DefaultCrawler(AbstractCrawler):
         return fixed_content.encode()
 
     def _get_pages_urls(self, sitemap_url: str) -> list[str] | None:
-        sitemap = requests.get(sitemap_url)
+        sitemap = self.downloader.get(sitemap_url)
         pages = None
         if sitemap.status_code == 404:
             self.interface.print("")
@@ -351,43 +354,151 @@ class DefaultCrawler(AbstractCrawler):
                 self.description = self._get_blog_description(tree)
                 self.title = self._get_blog_title(html_content)
 
-    def crawl(self):
-        self.interface.print(f"Starting {self.name}")
-        self.active = True
+    def _fetch_page(self, page_url: str) -> tuple[str, bytes] | None:
+        if self._break_the_loop():
+            return None
+        html_content = self.downloader.get_content(page_url)
+        if html_content is None:
+            self.interface.print(f"Cannot download: {page_url}")
+            return None
+        return page_url, html_content
+
+    def _get_parser_fingerprint(self) -> str:
+        """Everything, which has impact on extracted article besides the page itself."""
+        return "\n".join(
+            [
+                VERSION,
+                f"{type(self).__module__}.{type(self).__qualname__}",
+                f"{self.article_factory_class.__module__}.{self.article_factory_class.__qualname__}",
+                self.patterns.model_dump_json() if self.patterns is not None else "",
+                "\n".join(self.ignore_downloads),
+                str(self.language),
+                self.title,
+            ]
+        )
+
+    def _parse_page(self, page: tuple[str, bytes]) -> ArticleModel | None:
+        if self._break_the_loop():
+            return None
+        page_url, html_content = page
+        start = time.perf_counter(), time.thread_time()
+        cache_key = self.article_cache.get_key(html_content, f"{page_url}\n{self._get_parser_fingerprint()}")
+        art = self.article_cache.get(cache_key)
+        if art is not None:
+            # images are published again, as images settings could have changed since article was cached
+            self.downloader.download_images(art.images)
+            self._article_parsed(page_url, start, cache_hit=True)
+            return art
+        art_factory = self.article_factory_class(
+            url=page_url,
+            html_content=html_content,
+            patterns=self.patterns,
+            interface=self.interface,
+            dirs=self.dirs,
+            language=self.language,
+            downloader=self.downloader,
+            download_callback=self._break_the_loop,
+            blog_title=self.title,
+        )
+        art = art_factory.process()
+        if art is None:
+            self.checkpoint.set_status(page_url, PAGE_EMPTY)
+        elif not self._break_the_loop():
+            # when crawl was stopped in the middle of article, some of its images might be missing
+            self.article_cache.set(cache_key, art)
+        self._article_parsed(page_url, start)
+        return art
+
+    def _article_parsed(self, page_url: str, start: tuple[float, float], cache_hit: bool = False):
+        self.interface.event(
+            ArticleParsedEvent(
+                url=page_url,
+                ms=(time.perf_counter() - start[0]) * 1000,
+                cpu_ms=(time.thread_time() - start[1]) * 1000,
+                cache_hit=cache_hit,
+            )
+        )
+
+    def _add_article(self, art: ArticleModel):
+        self.images = self.images + art.images
+        if self.start:
+            self.end = art.date
+        else:
+            self.start = art.date
+        self.articles.append(art)
+
+    def _emit_article(self, art: ArticleModel) -> bool:
+        self._set_root_title(art.url)
+        self._add_article(art)
+        self.checkpoint.add_article(art)
+        self.interface.print(f"{len(self.articles)}. {art.title}")
+        if self.on_article is not None and self.on_article(art) is False:
+            return False
+        return not self._break_the_loop()
+
+    def _get_crawl_state(self, blog_pages: list[str]) -> CrawlStateModel:
+        return CrawlStateModel(
+            url=self.url,
+            pages=blog_pages,
+            title=self.title,
+            description=self.description,
+            language=self.language,
+            images=self.images,
+        )
+
+    def _resume_crawl(self, state: CrawlStateModel) -> list[str]:
+        """Restore blog metadata and finished articles from checkpoint, return pages left to crawl."""
+        self.title = state.title
+        self.description = state.description
+        self.language = state.language
+        self.images = state.images
+        for art in self.checkpoint.load_articles():
+            self._add_article(art)
+        statuses = self.checkpoint.load_statuses()
+        blog_pages = [page_url for page_url in state.pages if page_url not in statuses]
+        self.interface.print(
+            f"Resuming crawl: {len(self.articles)} articles restored, {len(blog_pages)} of {len(state.pages)} pages left."
+        )
+        return blog_pages
+
+    def _discover_pages(self) -> list[str] | None:
+        self.checkpoint.clear()
         blog_pages = None
         try:
             sitemap_url = self._get_sitemap_url()
             blog_pages = self._get_pages_urls(sitemap_url)
-        except URLError:
+        except requests.RequestException:
             self.cancelled = True
             self.interface.print(f"Networking error: {self.url}")
         if blog_pages:
             self._set_root_title()
-            for page_url in blog_pages:
-                html_content = self.downloader.get_content(page_url)
-                self._set_root_title(page_url)
-                art_factory = self.article_factory_class(
-                    url=page_url,
-                    html_content=html_content,
-                    patterns=self.patterns,
-                    interface=self.interface,
-                    dirs=self.dirs,
-                    language=self.language,
-                    downloader=self.downloader,
-                    download_callback=self._break_the_loop,
-                    blog_title=self.title,
-                )
-                art = art_factory.process()
-                if isinstance(art, ArticleModel):
-                    self.images = self.images + art.images
-                    if self.start:
-                        self.end = art.date
-                    else:
-                        self.start = art.date
-                    self.articles.append(art)
-                    self.interface.print(f"{len(self.articles)}. {art.title}")
-                else:
-                    pass
-                if self._break_the_loop():
-                    break
+            self.checkpoint.save_state(self._get_crawl_state(blog_pages))
+        return blog_pages
+
+    def _get_pipeline(self) -> Pipeline:
+        """Pages are fetched and parsed by separate workers, images are fetched by downloader fetch workers
+        and processed by image processor. Articles are emitted in sitemap order."""
+        return Pipeline(
+            stages=[
+                PipelineStage("fetch", self._fetch_page, self.configuration.crawl_fetch_workers),
+                PipelineStage("parse", self._parse_page, self.configuration.crawl_parse_workers),
+            ],
+            interface=self.interface,
+            queue_size=self.configuration.crawl_queue_size,
+            max_in_flight=self._get_articles_left(),
+        )
+
+    def crawl(self):
+        self.interface.print(f"Starting {self.name}")
+        self.active = True
+        state = self.checkpoint.load_state() if self.configuration.resume else None
+        if state is not None and state.url == self.url:
+            blog_pages = self._resume_crawl(state)
+        else:
+            blog_pages = self._discover_pages()
+        if blog_pages and not self._break_the_loop():
+            self._get_pipeline().run(blog_pages, self._emit_article)
+        self.downloader.wait_for_images()
+        for art in self.articles:
+            self.remove_missing_images(art)
         self.active = False
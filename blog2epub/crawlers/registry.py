@@ -0,0 +1,122 @@
+import importlib
+import re
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from blog2epub.crawlers.abstract import AbstractCrawler
+
+DEFAULT_ENGINE = "default"
+GENERATOR_META_RE = re.compile(rb"<meta\s[^>]*name\s*=\s*[\"']generator[\"'][^>]*>", re.IGNORECASE)
+META_CONTENT_RE = re.compile(rb"content\s*=\s*[\"']([^\"']*)[\"']", re.IGNORECASE)
+
+
+def get_generator(html_content: bytes) -> str | None:
+    """Content of <meta name="generator">, e.g. "WordPress 6.4.2" or "blogger"."""
+    meta = GENERATOR_META_RE.search(html_content)
+    if meta is None:
+        return None
+    content = META_CONTENT_RE.search(meta.group(0))
+    if content is None:
+        return None
+    return content.group(1).decode("utf-8", "replace").strip()
+
+
+class EngineRegistry(Mapping):
+    """Engine name to crawler class. Crawler module is imported only when its engine is used.
+    Engine of a blog is resolved from its url or, when url doesn't tell, from generator of its homepage."""
+
+    def __init__(self):
+        self._paths: dict[str, str] = {}
+        self._url_patterns: list[tuple[re.Pattern, str]] = []
+        self._generator_patterns: list[tuple[re.Pattern, str]] = []
+        self._generators: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        engine: str,
+        path: str,
+        url_patterns: list[str] | None = None,
+        generator_patterns: list[str] | None = None,
+    ):
+        self._paths[engine] = path
+        for pattern in url_patterns or []:
+            self._url_patterns.append((re.compile(pattern, re.IGNORECASE), engine))
+        for pattern in generator_patterns or []:
+            self._generator_patterns.append((re.compile(pattern, re.IGNORECASE), engine))
+
+    def __getitem__(self, engine: str) -> type["AbstractCrawler"]:
+        module_name, class_name = self._paths[engine].rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def __contains__(self, engine) -> bool:
+        return engine in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def get_engine_by_url(self, url: str) -> str | None:
+        for pattern, engine in self._url_patterns:
+            if pattern.search(url):
+                return engine
+        return None
+
+    def get_engine_by_generator(self, generator: str | None) -> str | None:
+        if generator:
+            for pattern, engine in self._generator_patterns:
+                if pattern.search(generator):
+                    return engine
+        return None
+
+    def _probe(self, url: str, fetch: Callable[[str], bytes | None]) -> str | None:
+        """Homepage is fetched once per url and process."""
+        with self._lock:
+            if url in self._generators:
+                return self._generators[url]
+        html_content = fetch(url)
+        generator = get_generator(html_content) if html_content else None
+        with self._lock:
+            self._generators[url] = generator
+        return generator
+
+    def resolve(
+        self, url: str, engine: str = DEFAULT_ENGINE, fetch: Callable[[str], bytes | None] | None = None
+    ) -> str:
+        """Explicitly chosen engine wins, then url patterns, then generator of the homepage (if fetch is given)."""
+        if engine != DEFAULT_ENGINE and engine in self:
+            return engine
+        resolved = self.get_engine_by_url(url)
+        if resolved is None and fetch is not None:
+            resolved = self.get_engine_by_generator(self._probe(url, fetch))
+        return resolved or DEFAULT_ENGINE
+
+
+ENGINES = EngineRegistry()
+ENGINES.register(DEFAULT_ENGINE, "blog2epub.crawlers.default.DefaultCrawler")
+ENGINES.register(
+    "wordpress",
+    "blog2epub.crawlers.wordpress.WordpressCrawler",
+    url_patterns=[r"\.wordpress\.com"],
+    generator_patterns=[r"^wordpress"],
+)
+ENGINES.register(
+    "blogger",
+    "blog2epub.crawlers.blogspot.BlogspotCrawler",
+    url_patterns=[r"\.blogspot\."],
+    generator_patterns=[r"^blogger"],
+)
+ENGINES.register(
+    "nrdblog_cmosnet",
+    "blog2epub.crawlers.nrdblog_cmosnet.NrdblogCmosEuCrawler",
+    url_patterns=[r"nrdblog\.cmosnet\.eu"],
+)
+ENGINES.register(
+    "zeissikonveb",
+    "blog2epub.crawlers.zeissikonveb.ZeissIkonVEBCrawler",
+    url_patterns=[r"zeissikonveb\.de"],
+)
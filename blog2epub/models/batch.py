@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class BatchBlogModel(BaseModel):
+    url: str
+    output: str | None = None
+    options: dict[str, Any] = {}
+
+
+class BatchResultModel(BaseModel):
+    url: str
+    success: bool = False
+    error: str | None = None
+    articles: int = 0
+    images: int = 0
+    requests: int = 0
+    downloaded_bytes: int = 0
+    epub_files: list[str] = []
+    epub_bytes: int = 0
+    crawl_time: float = 0.0
+    build_time: float = 0.0
+
+
+class BatchSummaryModel(BaseModel):
+    started: datetime
+    total_time: float = 0.0
+    jobs: int
+    failures: int = 0
+    blogs: list[BatchResultModel] = []
@@ -47,6 +47,11 @@ class ArticleModel(BaseModel):
     images: list[ImageModel] = []
 
 
+class CrawledArticleModel(BaseModel):
+    article: ArticleModel
+    image_paths: list[str] = []
+
+
 class DirModel(BaseModel):
     path: str
 
@@ -62,6 +67,14 @@ class DirModel(BaseModel):
     def originals(self) -> str:
         return os.path.join(self.path, "originals")
 
+    @property
+    def variants(self) -> str:
+        return os.path.join(self.path, "variants")
+
+    @property
+    def thumbnails(self) -> str:
+        return os.path.join(self.path, "thumbnails")
+
 
 class BookModel(BaseModel):
     url: str
@@ -77,3 +90,10 @@ class BookModel(BaseModel):
     destination_folder: str | None
     cover: str | None
     cover_image_path: str | None
+
+
+class BuildRecordModel(BaseModel):
+    """Previous ebook build: file path and fingerprints of its zip entries."""
+
+    file: str
+    entries: dict[str, str] = {}
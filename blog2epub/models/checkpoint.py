@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+from blog2epub.models.book import ImageModel
+
+
+class CrawlStateModel(BaseModel):
+    url: str
+    pages: list[str] = []
+    title: str = ""
+    description: str = ""
+    language: str | None = None
+    images: list[ImageModel] = []
+
+
+class PageStatusModel(BaseModel):
+    url: str
+    status: str
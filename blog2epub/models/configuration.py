@@ -41,11 +41,31 @@ class ConfigurationModel(BaseModel):
     include_images: bool = True
     images_size: tuple[int, int] = (2160, 3840)
     images_quality: int = 85
+    images_passthrough_bytes: int = 300000
     images_bw: bool = False
+    images_bw_contrast: float = 1.0
+    images_bw_levels: int = 16
+    images_bw_dither: bool = False
+    images_workers: int = 0
+    images_pool: str = "thread"
+    crawl_fetch_workers: int = 4
+    crawl_parse_workers: int = 2
+    crawl_image_fetch_workers: int = 4
+    crawl_queue_size: int = 16
+    resume: bool = False
+    warc_record: str = ""
+    warc_replay: str = ""
+    max_book_size_mb: float = 0
+    incremental: bool = False
+    max_chapter_size_kb: int = 512
+    volume_split: str = ""
+    volume_size: int = 0
     url: str = ""
     limit: str = "5"
     skip: str = ""
     engine: str = "default"
+    # with default engine, blog engine is recognised by <meta name="generator"> of its homepage
+    engine_probe: bool = True
     history: list[str] = field(default_factory=list)
     email: str = ""
     version: str = ""
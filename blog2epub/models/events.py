@@ -0,0 +1,42 @@
+import time
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class EventModel(BaseModel):
+    event: str
+    timestamp: float = Field(default_factory=time.time)
+
+
+class PageFetchedEvent(EventModel):
+    event: Literal["page_fetched"] = "page_fetched"
+    url: str
+    bytes: int = 0
+    ms: float = 0.0
+    cache_hit: bool = False
+
+
+class ArticleParsedEvent(EventModel):
+    event: Literal["article_parsed"] = "article_parsed"
+    url: str
+    ms: float = 0.0
+    cpu_ms: float = 0.0
+    cache_hit: bool = False
+
+
+class ImageProcessedEvent(EventModel):
+    event: Literal["image_processed"] = "image_processed"
+    url: str
+    bytes_in: int = 0
+    bytes_out: int = 0
+    ms: float = 0.0
+    success: bool = False
+
+
+class BookWrittenEvent(EventModel):
+    event: Literal["book_written"] = "book_written"
+    file_name: str
+    articles: int = 0
+    bytes: int = 0
+    ms: float = 0.0
@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+
+
+class ImageProfileModel(BaseModel):
+    size: tuple[int, int]
+    quality: int
+    passthrough_bytes: int = 0
+    grayscale: bool = False
+    contrast: float = 1.0
+    levels: int = 0
+    dither: bool = False
+
+    @property
+    def variant_key(self) -> str:
+        mode = "rgb"
+        if self.grayscale:
+            mode = f"bw{self.levels}{'d' if self.dither else ''}c{self.contrast:g}"
+        return f"{self.size[0]}x{self.size[1]}_q{self.quality}_{mode}_p{self.passthrough_bytes}"
+
+
+class ImageTaskModel(BaseModel):
+    url: str
+    original: str
+    variant: str
+    destination: str
+    profile: ImageProfileModel
+    tile: str | None = None
+
+
+class ImageResultModel(BaseModel):
+    url: str
+    destination: str
+    success: bool = False
+    passthrough: bool = False
+    processing_time: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    error: str | None = None
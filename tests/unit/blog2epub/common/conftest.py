@@ -0,0 +1,46 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from blog2epub.models.book import ArticleModel, BookModel, DirModel, ImageModel
+
+
+@pytest.fixture()
+def given_book_data(tmp_path) -> BookModel:
+    dirs = DirModel(path=str(tmp_path))
+    os.makedirs(dirs.images)
+    articles = []
+    images = []
+    for number in range(1, 4):
+        image = ImageModel(url=f"https://example.com/image_{number}.jpg")
+        noise = np.random.default_rng(number).integers(0, 255, (600, 800, 3), dtype=np.uint8)
+        Image.fromarray(noise).save(os.path.join(dirs.images, image.file_name), format="JPEG", quality=90)
+        images.append(image)
+        articles.append(
+            ArticleModel(
+                url=f"https://example.com/article_{number}.html",
+                title=f"Article {number}",
+                date=datetime(2024, 1, number),
+                content=f'<p>Article {number}</p><img src="images/{image.file_name}"/>',
+                comments="",
+                images=[image],
+            )
+        )
+    return BookModel(
+        url="https://example.com",
+        title="Example blog",
+        subtitle=None,
+        description=None,
+        dirs=dirs,
+        articles=articles,
+        images=images,
+        start=None,
+        end=None,
+        file_name_prefix="example_com",
+        destination_folder=str(tmp_path),
+        cover=None,
+        cover_image_path=None,
+    )
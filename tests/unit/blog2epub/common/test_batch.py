@@ -0,0 +1,86 @@
+import locale
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from blog2epub.common.batch import BatchRunner, load_batch_file
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.throttle import ConnectionLimiter
+from blog2epub.models.batch import BatchBlogModel
+from blog2epub.models.configuration import ConfigurationModel
+
+
+class TestBatch:
+    def test_load_batch_file_reads_yaml_with_options(self, tmp_path):
+        # given
+        given_file = tmp_path / "blogs.yaml"
+        given_file.write_text("- example.com\n- url: blog.example.org\n  output: blog.epub\n  limit: 10\n")
+        # when
+        blogs = load_batch_file(str(given_file))
+        # then
+        assert blogs == [
+            BatchBlogModel(url="example.com"),
+            BatchBlogModel(url="blog.example.org", output="blog.epub", options={"limit": 10}),
+        ]
+
+    def test_connection_limiter_limits_requests_per_host(self):
+        # given
+        limiter = ConnectionLimiter(max_connections=4, max_per_host=2)
+        running = {"example.com": 0, "example.org": 0}
+        max_running = dict(running)
+        lock = threading.Lock()
+
+        def request(url: str):
+            host = url.split("/")[2]
+            with limiter.limit(url):
+                with lock:
+                    running[host] += 1
+                    max_running[host] = max(max_running[host], running[host])
+                time.sleep(0.01)
+                with lock:
+                    running[host] -= 1
+
+        # when
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(request, [f"https://example.{tld}/{n}" for n in range(8) for tld in ("com", "org")]))
+        # then
+        assert max_running == {"example.com": 2, "example.org": 2}
+
+    @patch("blog2epub.common.batch.Blog2Epub", MagicMock(side_effect=ConnectionError("unreachable")))
+    def test_run_reports_failures_per_blog(self, tmp_path):
+        # given
+        runner = BatchRunner(
+            configuration=ConfigurationModel(destination_folder=str(tmp_path)),
+            interface=EmptyInterface(),
+            jobs=2,
+            cpu_budget=4,
+        )
+        # when
+        summary = runner.run([BatchBlogModel(url="example.com"), BatchBlogModel(url="example.org")])
+        # then
+        assert summary.failures == 2
+        assert [result.url for result in summary.blogs] == ["example.com", "example.org"]
+        assert summary.blogs[0].error == "ConnectionError: unreachable"
+        assert runner._get_configuration(BatchBlogModel(url="example.com", options={"limit": 5})).limit == "5"
+
+    @patch("blog2epub.common.book.locale.setlocale")
+    def test_run_sets_locale_once_for_all_books(self, setlocale, given_book_data, tmp_path):
+        # given
+        given_blog2epub = MagicMock()
+        given_blog2epub.crawler.get_book_data.return_value = given_book_data
+        given_blog2epub.crawler.articles = given_book_data.articles
+        given_blog2epub.crawler.language = "pl_PL.UTF-8"
+        runner = BatchRunner(
+            configuration=ConfigurationModel(destination_folder=str(tmp_path)),
+            interface=EmptyInterface(),
+            jobs=2,
+        )
+        # when
+        with patch("blog2epub.common.batch.Blog2Epub", MagicMock(return_value=given_blog2epub)):
+            summary = runner.run(
+                [BatchBlogModel(url="example.com", output="first.epub"), BatchBlogModel(url="example.org")]
+            )
+        # then
+        assert summary.failures == 0
+        setlocale.assert_called_once_with(locale.LC_ALL, "en_US.UTF-8")
@@ -0,0 +1,222 @@
+import os
+import zipfile
+from datetime import datetime
+from unittest.mock import patch
+
+from blog2epub.common.book import Book, Chapter, split_html
+from blog2epub.common.book_cache import BookCache
+from blog2epub.common.epub_writer import copy_raw_entry
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.models.configuration import ConfigurationModel
+
+
+class TestBook:
+    def test_save_fits_book_into_size_limit(self, given_book_data, tmp_path):
+        # given
+        given_configuration = ConfigurationModel(destination_folder=str(tmp_path), max_book_size_mb=1)
+        ebook = Book(
+            book_data=given_book_data,
+            configuration=given_configuration,
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        ebook.save()
+        # then
+        assert os.path.getsize(ebook.file_full_path) <= 1024 * 1024
+        with zipfile.ZipFile(ebook.file_full_path) as epub:
+            assert len([name for name in epub.namelist() if name.startswith("EPUB/images/")]) == 3
+
+    def test_save_stores_images_without_compression(self, given_book_data, tmp_path):
+        # given
+        ebook = Book(
+            book_data=given_book_data,
+            configuration=ConfigurationModel(destination_folder=str(tmp_path)),
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        ebook.save()
+        # then
+        with zipfile.ZipFile(ebook.file_full_path) as epub:
+            assert epub.namelist()[0] == "mimetype"
+            for image in given_book_data.images:
+                image_info = epub.getinfo(f"EPUB/images/{image.file_name}")
+                assert image_info.compress_type == zipfile.ZIP_STORED
+                with open(os.path.join(given_book_data.dirs.images, image.file_name), "rb") as f:
+                    assert epub.read(image_info) == f.read()
+
+    def test_save_writes_cover_into_manifest(self, given_book_data, tmp_path):
+        # given
+        ebook = Book(
+            book_data=given_book_data,
+            configuration=ConfigurationModel(destination_folder=str(tmp_path)),
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        ebook.save()
+        # then
+        with zipfile.ZipFile(ebook.file_full_path) as epub:
+            names = epub.namelist()
+            content_opf = epub.read("EPUB/content.opf").decode()
+        assert len(names) == len(set(names))
+        assert "EPUB/cover.xhtml" in names
+        assert f"EPUB/{os.path.basename(ebook.cover_image_path)}" in names
+        assert 'id="cover"' in content_opf
+        assert 'id="cover_img"' in content_opf
+
+    def test_incremental_save_copies_unchanged_entries_from_previous_build(self, given_book_data, tmp_path):
+        # given
+        given_configuration = ConfigurationModel(destination_folder=str(tmp_path), incremental=True)
+        first_ebook = Book(
+            book_data=given_book_data,
+            configuration=given_configuration,
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        first_ebook.save(articles=given_book_data.articles[:2])
+        second_ebook = Book(
+            book_data=given_book_data,
+            configuration=given_configuration,
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        with patch("blog2epub.common.epub_writer.copy_raw_entry", wraps=copy_raw_entry) as copy_raw:
+            second_ebook.save()
+        # then
+        with zipfile.ZipFile(second_ebook.file_full_path) as second_epub:
+            assert second_epub.testzip() is None
+        copied = {call.args[2] for call in copy_raw.call_args_list}
+        chapter_names = [f"EPUB/{chapter.epub.file_name}" for chapter in second_ebook.chapters]
+        assert [name for name in chapter_names if name in copied] == chapter_names[:2]
+
+    def test_incremental_save_doesnt_reuse_changed_articles(self, given_book_data, tmp_path):
+        # given
+        given_configuration = ConfigurationModel(destination_folder=str(tmp_path), incremental=True)
+        first_ebook = Book(
+            book_data=given_book_data,
+            configuration=given_configuration,
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        first_ebook.save()
+        given_book_data.articles[1] = given_book_data.articles[1].model_copy(update={"content": "<p>Changed</p>"})
+        second_ebook = Book(
+            book_data=given_book_data,
+            configuration=given_configuration,
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        with patch("blog2epub.common.epub_writer.copy_raw_entry", wraps=copy_raw_entry) as copy_raw:
+            second_ebook.save()
+        # then
+        copied = {call.args[2] for call in copy_raw.call_args_list}
+        chapter_names = [f"EPUB/{chapter.epub.file_name}" for chapter in second_ebook.chapters]
+        assert chapter_names[1] not in copied
+        assert [name for name in chapter_names if name in copied] == [chapter_names[0]] + chapter_names[2:]
+        with zipfile.ZipFile(second_ebook.file_full_path) as second_epub:
+            assert "<p>Changed</p>" in second_epub.read(chapter_names[1]).decode()
+
+    def test_save_keeps_articles_with_duplicated_url_and_tracks_accessed_date(self, given_book_data, tmp_path):
+        # given
+        given_duplicate = given_book_data.articles[0].model_copy(
+            update={"accessed": datetime(2024, 2, 1, 10, 0), "content": "<p>Copy</p>"}
+        )
+        given_articles = given_book_data.articles + [given_duplicate]
+        ebook = Book(
+            book_data=given_book_data,
+            configuration=ConfigurationModel(destination_folder=str(tmp_path)),
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        ebook.save(articles=given_articles)
+        # then
+        uids = [chapter.epub.id for chapter in ebook.chapters]
+        assert len(uids) == len(given_articles) == len(set(uids))
+        assert uids[-1] == f"{uids[0]}-2"
+        fingerprint_args = ("en_US.UTF-8", ebook.configuration.max_chapter_size_kb * 1024, uids[0])
+        first_article = given_book_data.articles[0]
+        assert ebook.chapters[0].fingerprint == Chapter.get_fingerprint(first_article, *fingerprint_args)
+        assert ebook.chapters[0].fingerprint != Chapter.get_fingerprint(
+            first_article.model_copy(update={"accessed": datetime(2024, 2, 1, 10, 0)}), *fingerprint_args
+        )
+
+    def test_save_splits_large_article_into_parts(self, given_book_data, tmp_path):
+        # given
+        given_book_data.articles[0].comments = "".join(f"<h4>Author {n}</h4><p>{'x' * 200}</p>" for n in range(100))
+        ebook = Book(
+            book_data=given_book_data,
+            configuration=ConfigurationModel(destination_folder=str(tmp_path), max_chapter_size_kb=4),
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        ebook.save()
+        # then
+        large_chapter = ebook.chapters[0]
+        assert len(large_chapter.parts) > 5
+        assert all(len(part.content.encode("utf-8")) < 5 * 1024 for part in large_chapter.parts)
+        assert len(ebook.book.toc) == len(given_book_data.articles)
+        spine = [item.id for item in ebook.book.spine if not isinstance(item, str)]
+        parts_ids = [part.id for part in large_chapter.parts]
+        assert [uid for uid in spine if uid in parts_ids] == parts_ids
+
+    def test_split_html_keeps_text_escaped(self):
+        # given
+        given_fragment = f"1 &lt; 2 &amp; 3<div>inner &lt;script&gt; text<p>{'x' * 300}</p>after &amp;</div>tail &lt;"
+        # when
+        pages = split_html(given_fragment, 200)
+        # then
+        joined = "".join(pages)
+        assert joined.startswith("1 &lt; 2 &amp; 3")
+        assert "inner &lt;script&gt; text" in joined
+        assert "after &amp;" in joined
+        assert joined.endswith("tail &lt;")
+        assert "<script>" not in joined
+
+    def test_save_includes_only_images_of_selected_articles(self, given_book_data, tmp_path):
+        # given
+        ebook = Book(
+            book_data=given_book_data,
+            configuration=ConfigurationModel(destination_folder=str(tmp_path)),
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+        )
+        # when
+        ebook.save(articles=given_book_data.articles[1:2])
+        # then
+        with zipfile.ZipFile(ebook.file_full_path) as epub:
+            images = [name for name in epub.namelist() if name.startswith("EPUB/images/")]
+        assert images == [f"EPUB/images/{given_book_data.images[1].file_name}"]
+
+    def test_save_reuses_chapters_and_images_from_cache(self, given_book_data, tmp_path):
+        # given
+        given_cache = BookCache()
+        given_configuration = ConfigurationModel(destination_folder=str(tmp_path))
+        first_ebook = Book(
+            book_data=given_book_data,
+            configuration=given_configuration,
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+            cache=given_cache,
+        )
+        first_ebook.save(articles=given_book_data.articles[:2])
+        second_ebook = Book(
+            book_data=given_book_data,
+            configuration=given_configuration,
+            interface=EmptyInterface(),
+            destination_folder=str(tmp_path),
+            cache=given_cache,
+        )
+        # when
+        second_ebook.save()
+        # then
+        assert first_ebook.chapters[0] is second_ebook.chapters[0]
+        assert first_ebook.chapters[1] is second_ebook.chapters[1]
+        with zipfile.ZipFile(second_ebook.file_full_path) as epub:
+            assert epub.testzip() is None
+            assert len([name for name in epub.namelist() if name.startswith("EPUB/images/")]) == 3
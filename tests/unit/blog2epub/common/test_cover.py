@@ -0,0 +1,51 @@
+import os
+
+from PIL import Image
+
+from blog2epub.common.cover import Cover
+from blog2epub.common.interfaces import EmptyInterface
+
+
+class TestCover:
+    def test_generate_composes_cover_from_cached_tiles(self, given_book_data):
+        # given
+        cover = Cover(
+            dirs=given_book_data.dirs,
+            interface=EmptyInterface(),
+            file_name="example_com.epub",
+            blog_url="example_com",
+            title=given_book_data.title,
+            subtitle="1-3 January 2024",
+            images=given_book_data.images,
+        )
+        # when
+        _, cover_file_full_path = cover.generate()
+        # then
+        assert sorted(os.listdir(given_book_data.dirs.thumbnails)) == sorted(
+            image.file_name for image in given_book_data.images
+        )
+        with Image.open(cover_file_full_path) as cover_image:
+            assert cover_image.size == (600, 800)
+            # tiles get darker towards the bottom of the cover
+            assert cover_image.getpixel((60, 60)) > cover_image.getpixel((540, 620))
+
+    def test_generate_skips_unreadable_tiles(self, given_book_data):
+        # given
+        os.makedirs(given_book_data.dirs.thumbnails, exist_ok=True)
+        broken_image = given_book_data.images[0]
+        with open(os.path.join(given_book_data.dirs.thumbnails, broken_image.file_name), "wb") as f:
+            f.write(b"\xff\xd8\xff\xe0 truncated")
+        cover = Cover(
+            dirs=given_book_data.dirs,
+            interface=EmptyInterface(),
+            file_name="example_com.epub",
+            blog_url="example_com",
+            title=given_book_data.title,
+            subtitle="1-3 January 2024",
+            images=[broken_image],
+        )
+        # when
+        _, cover_file_full_path = cover.generate()
+        # then
+        with Image.open(cover_file_full_path) as cover_image:
+            assert cover_image.size == (600, 800)
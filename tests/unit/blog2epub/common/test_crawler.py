@@ -40,6 +40,13 @@ class TestCommonCrawler(unittest.TestCase):
         assert port_1 == 80
         assert port_2 == 443
 
+    def test_prepare_port_and_url_keeps_non_default_port(self):
+        # When:
+        port, result = prepare_port_and_url("http://127.0.0.1:8080/2024/01/post.html")
+        # Then:
+        assert port == 8080
+        assert result == "http://127.0.0.1:8080"
+
     def test_prepare_url_always_subdomain_for_blogspot_and_wordpress_com(self):
         # When
         port_0, result_1 = prepare_port_and_url("https://test.blogspot.com/sub-category/name.html")
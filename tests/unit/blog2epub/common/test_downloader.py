@@ -0,0 +1,88 @@
+import io
+import os
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from blog2epub.common.downloader import Downloader
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.models.book import DirModel, ImageModel
+from blog2epub.models.images import ImageProfileModel
+
+
+def _given_image_bytes() -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (800, 600), (200, 100, 50)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def _given_downloader(tmp_path, quality: int) -> Downloader:
+    return Downloader(
+        dirs=DirModel(path=str(tmp_path)),
+        url="https://example.com",
+        interface=EmptyInterface(),
+        images_profile=ImageProfileModel(size=(400, 400), quality=quality),
+        ignore_downloads=[],
+    )
+
+
+class TestDownloader:
+    @patch("time.sleep", MagicMock())
+    def test_download_image_reuses_original_for_new_variant(self, tmp_path):
+        # given
+        given_image = ImageModel(url="https://example.com/image.png")
+        first_downloader = _given_downloader(tmp_path, quality=80)
+        first_downloader._get_image_bytes_from_web = MagicMock(return_value=_given_image_bytes())
+        second_downloader = _given_downloader(tmp_path, quality=40)
+        second_downloader._get_image_bytes_from_web = MagicMock()
+        # when
+        first_result = first_downloader.download_image(given_image)
+        first_downloader.wait_for_images()
+        second_result = second_downloader.download_image(given_image)
+        second_downloader.wait_for_images()
+        # then
+        assert first_result and second_result
+        second_downloader._get_image_bytes_from_web.assert_not_called()
+        variants = sorted(os.listdir(first_downloader.dirs.variants))
+        assert len(variants) == 2
+        assert os.path.samefile(
+            os.path.join(first_downloader.dirs.images, given_image.file_name),
+            os.path.join(first_downloader.dirs.variants, [v for v in variants if "_q40_" in v][0]),
+        )
+
+    @patch("time.sleep", MagicMock())
+    @patch("blog2epub.common.images.process_image", MagicMock(side_effect=OSError("broken")))
+    def test_image_with_failed_processing_is_reported_missing(self, tmp_path):
+        # given
+        given_image = ImageModel(url="https://example.com/image.png")
+        given_downloader = _given_downloader(tmp_path, quality=80)
+        given_downloader._get_image_bytes_from_web = MagicMock(return_value=_given_image_bytes())
+        # when
+        result = given_downloader.download_image(given_image)
+        missing = given_downloader.get_missing_images([given_image])
+        given_downloader.wait_for_images()
+        # then
+        assert result
+        assert missing == [given_image]
+        assert not given_downloader.image_processor.is_pending(
+            os.path.join(given_downloader.dirs.images, given_image.file_name)
+        )
+
+    def test_replay_downloads_images_without_delay(self, tmp_path):
+        # given
+        given_downloader = Downloader(
+            dirs=DirModel(path=str(tmp_path)),
+            url="https://example.com",
+            interface=EmptyInterface(),
+            images_profile=ImageProfileModel(size=(400, 400), quality=80),
+            ignore_downloads=[],
+            warc_replay=str(tmp_path / "crawl.warc.gz"),
+        )
+        given_downloader._get_image_bytes_from_web = MagicMock(return_value=_given_image_bytes())
+        # when
+        with patch("time.sleep") as sleep:
+            result = given_downloader.download_image(ImageModel(url="https://example.com/image.png"))
+            given_downloader.wait_for_images()
+        # then
+        assert result
+        sleep.assert_not_called()
@@ -0,0 +1,166 @@
+import os
+from unittest.mock import patch
+
+from PIL import Image
+
+from blog2epub.common.images import (
+    ImageProcessor,
+    atomic_path,
+    has_transparency,
+    process_image,
+    reduced_decode,
+    to_eink_grayscale,
+)
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.models.images import ImageProfileModel, ImageTaskModel
+
+
+def _given_task(tmp_path, size=(800, 600), mode="RGB", file_format="PNG") -> ImageTaskModel:
+    original = os.path.join(tmp_path, "original.png")
+    Image.new(mode, size).save(original, format=file_format)
+    return ImageTaskModel(
+        url="https://example.com/original.png",
+        original=original,
+        variant=os.path.join(tmp_path, "variant.jpg"),
+        destination=os.path.join(tmp_path, "resized.jpg"),
+        profile=ImageProfileModel(size=(400, 400), quality=80),
+    )
+
+
+class TestImages:
+    def test_process_image_resizes_and_converts_to_jpeg(self, tmp_path):
+        # given
+        given_task = _given_task(tmp_path, mode="RGBA")
+        # when
+        result = process_image(given_task)
+        # then
+        assert result.success
+        assert os.path.isfile(given_task.original)
+        assert os.path.samefile(given_task.variant, given_task.destination)
+        with Image.open(given_task.destination) as picture:
+            assert picture.format == "JPEG"
+            assert picture.mode == "RGB"
+            assert picture.size == (400, 300)
+
+    def test_process_image_leaves_no_variant_when_encoding_fails(self, tmp_path):
+        # given
+        given_task = _given_task(tmp_path)
+
+        def failing_save(picture, fp, *args, **kwargs):
+            with open(fp, "wb") as f:
+                f.write(b"\xff\xd8 truncated")
+            raise OSError("worker killed")
+
+        # when
+        with patch.object(Image.Image, "save", failing_save):
+            result = process_image(given_task)
+        # then
+        assert not result.success
+        assert not os.path.exists(given_task.variant)
+        assert os.listdir(tmp_path) == ["original.png"]
+
+    def test_atomic_path_moves_file_into_place(self, tmp_path):
+        # given
+        given_path = os.path.join(tmp_path, "variant.jpg")
+        # when
+        with atomic_path(given_path) as temp_path:
+            with open(temp_path, "wb") as f:
+                f.write(b"content")
+            written_before_replace = os.path.exists(given_path)
+        # then
+        assert not written_before_replace
+        with open(given_path, "rb") as f:
+            assert f.read() == b"content"
+        assert os.listdir(tmp_path) == ["variant.jpg"]
+
+    def test_image_processor_reports_processing_time(self, tmp_path):
+        # given
+        given_task = _given_task(tmp_path)
+        processor = ImageProcessor(interface=EmptyInterface(), workers=2)
+        # when
+        processor.submit(given_task)
+        processor.wait()
+        # then
+        assert len(processor.results) == 1
+        assert processor.results[0].processing_time > 0
+        assert not processor.is_pending(given_task.destination)
+        assert os.path.isfile(given_task.destination)
+
+    def test_image_processor_blocks_submit_above_max_pending(self, tmp_path):
+        # given
+        given_tasks = []
+        for number in range(3):
+            os.makedirs(os.path.join(tmp_path, str(number)))
+            given_tasks.append(_given_task(os.path.join(tmp_path, str(number))))
+        processor = ImageProcessor(interface=EmptyInterface(), workers=1, max_pending=1)
+        # when
+        for task in given_tasks:
+            processor.submit(task)
+            assert len(processor._pending) <= 1
+        processor.wait()
+        # then
+        assert len(processor.results) == 3
+        assert all(os.path.isfile(task.destination) for task in given_tasks)
+
+    def test_reduced_decode_uses_jpeg_draft_covering_target_size(self, tmp_path):
+        # given
+        original = os.path.join(tmp_path, "original.jpg")
+        Image.new("RGB", (4000, 3000)).save(original, format="JPEG")
+        # when
+        with Image.open(original) as picture:
+            result = reduced_decode(picture, (500, 500))
+            # then
+            assert result.size == (500, 375)
+
+    def test_process_image_keeps_original_which_already_fits(self, tmp_path):
+        # given
+        given_task = _given_task(tmp_path, size=(200, 100))
+        given_task.profile.passthrough_bytes = 100000
+        with open(given_task.original, "rb") as f:
+            given_bytes = f.read()
+        # when
+        result = process_image(given_task)
+        # then
+        assert result.success
+        assert result.passthrough
+        with open(given_task.destination, "rb") as f:
+            assert f.read() == given_bytes
+
+    def test_process_image_converts_to_grayscale_with_16_levels(self, tmp_path):
+        # given
+        given_task = _given_task(tmp_path)
+        given_task.profile.grayscale = True
+        given_task.profile.levels = 16
+        Image.linear_gradient("L").convert("RGB").resize((800, 600)).save(given_task.original, format="PNG")
+        # when
+        result = process_image(given_task)
+        # then
+        assert result.success
+        with Image.open(given_task.destination) as picture:
+            assert picture.mode == "L"
+
+    def test_to_eink_grayscale_quantizes_and_flattens_transparency(self):
+        # given
+        given_picture = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
+        given_picture.paste((0, 0, 0, 255), (0, 0, 5, 10))
+        # when
+        result = to_eink_grayscale(given_picture, levels=16)
+        # then
+        assert has_transparency(given_picture)
+        assert result.getpixel((0, 0)) == 0
+        assert result.getpixel((9, 9)) == 255
+        assert len(result.getcolors()) <= 16
+
+    def test_process_image_saves_cover_tile(self, tmp_path):
+        # given
+        given_task = _given_task(tmp_path).model_copy(update={"tile": os.path.join(tmp_path, "tile.jpg")})
+        # when
+        process_image(given_task)
+        small_task = _given_task(tmp_path, size=(100, 300)).model_copy(
+            update={"tile": os.path.join(tmp_path, "small_tile.jpg")}
+        )
+        process_image(small_task)
+        # then
+        with Image.open(given_task.tile) as tile:
+            assert tile.size == (120, 120)
+        assert not os.path.exists(small_task.tile)
@@ -0,0 +1,46 @@
+import json
+
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.metrics import Metrics
+from blog2epub.models.events import ArticleParsedEvent, ImageProcessedEvent, PageFetchedEvent
+
+
+class TestMetrics:
+    def test_event_updates_counters_and_writes_sink(self, tmp_path):
+        # given
+        given_sink = tmp_path / "events.jsonl"
+        given_interface = EmptyInterface(metrics=Metrics(sink_path=str(given_sink)))
+        # when
+        given_interface.event(PageFetchedEvent(url="https://example.com/1", bytes=100, ms=20, cache_hit=False))
+        given_interface.event(PageFetchedEvent(url="https://example.com/2", bytes=50, ms=10, cache_hit=True))
+        given_interface.event(ArticleParsedEvent(url="https://example.com/1", ms=5))
+        given_interface.event(ImageProcessedEvent(url="https://example.com/a.png", bytes_in=1000, bytes_out=300))
+        given_interface.metrics.close()
+        # then
+        counters = given_interface.metrics.get_counters()
+        assert counters["page_fetched.count"] == 2
+        assert counters["page_fetched.bytes"] == 150
+        assert counters["page_fetched.ms"] == 30
+        assert counters["page_fetched.cache_hits"] == 1
+        assert counters["image_processed.bytes_out"] == 300
+        assert counters["image_processed.errors"] == 1
+        events = [json.loads(line) for line in given_sink.read_text().splitlines()]
+        assert [event["event"] for event in events] == [
+            "page_fetched",
+            "page_fetched",
+            "article_parsed",
+            "image_processed",
+        ]
+        assert "page_fetched: 2, 15.0 ms avg, 1 from cache" in given_interface.metrics.get_summary()
+
+    def test_interface_without_super_init_has_metrics(self):
+        # given
+        class GivenInterface(EmptyInterface):
+            def __init__(self):
+                self.lines = []
+
+        given_interface = GivenInterface()
+        # when
+        given_interface.event(ArticleParsedEvent(url="https://example.com/1", ms=5))
+        # then
+        assert given_interface.metrics.get_counters()["article_parsed.count"] == 1
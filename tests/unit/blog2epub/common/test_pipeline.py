@@ -0,0 +1,97 @@
+import threading
+import time
+
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.pipeline import Pipeline, PipelineStage
+
+
+def _slow_double(number: int) -> int:
+    time.sleep(0.001 * (number % 3))
+    return number * 2
+
+
+def _drop_odd(number: int) -> int | None:
+    return None if number % 2 else number
+
+
+class TestPipeline:
+    def test_run_emits_results_in_input_order(self):
+        # given
+        pipeline = Pipeline(
+            stages=[PipelineStage("double", _slow_double, workers=4), PipelineStage("drop", _drop_odd, workers=2)],
+            interface=EmptyInterface(),
+            queue_size=2,
+        )
+        emitted = []
+        # when
+        pipeline.run(range(20), emitted.append)
+        # then
+        assert emitted == [number * 2 for number in range(20)]
+
+    def test_run_stops_when_emit_returns_false(self):
+        # given
+        pipeline = Pipeline(stages=[PipelineStage("double", _slow_double, workers=3)], interface=EmptyInterface())
+        emitted = []
+
+        def emit(result: int) -> bool:
+            emitted.append(result)
+            return len(emitted) < 5
+
+        # when
+        pipeline.run(range(1000), emit)
+        # then
+        assert emitted == [0, 2, 4, 6, 8]
+
+    def test_run_feeds_no_more_than_max_in_flight_items(self):
+        # given
+        processed = []
+
+        def fetch(number: int) -> int:
+            processed.append(number)
+            return number
+
+        pipeline = Pipeline(
+            stages=[PipelineStage("fetch", fetch, workers=4)],
+            interface=EmptyInterface(),
+            queue_size=16,
+            max_in_flight=5,
+        )
+        emitted = []
+
+        def emit(result: int) -> bool:
+            emitted.append(result)
+            return len(emitted) < 5
+
+        # when
+        pipeline.run(range(1000), emit)
+        # then
+        assert emitted == [0, 1, 2, 3, 4]
+        assert sorted(processed) == [0, 1, 2, 3, 4]
+
+    def test_run_bounds_items_in_flight_without_limit(self):
+        # given
+        first_done = threading.Event()
+        parsed_before_first = []
+
+        def fetch(number: int) -> int:
+            if number == 0:
+                time.sleep(0.5)
+                first_done.set()
+            return number
+
+        def parse(number: int) -> int:
+            if not first_done.is_set():
+                parsed_before_first.append(number)
+            return number
+
+        pipeline = Pipeline(
+            stages=[PipelineStage("fetch", fetch, workers=4), PipelineStage("parse", parse, workers=2)],
+            interface=EmptyInterface(),
+            queue_size=4,
+        )
+        emitted = []
+        # when
+        pipeline.run(range(5000), emitted.append)
+        # then
+        assert emitted == list(range(5000))
+        assert len(parsed_before_first) < pipeline.get_in_flight_limit()
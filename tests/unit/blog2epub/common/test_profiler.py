@@ -0,0 +1,33 @@
+import os
+
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.pipeline import Pipeline, PipelineStage
+from blog2epub.common.profiler import Profiler
+from blog2epub.models.events import ArticleParsedEvent, PageFetchedEvent
+
+
+class TestProfiler:
+    def test_report_contains_stages_and_slowest_articles(self, tmp_path):
+        # given
+        given_profiler = Profiler(dump_path=str(tmp_path / "run.pstats"), top=2)
+        given_interface = EmptyInterface(metrics=given_profiler)
+        given_pipeline = Pipeline(
+            stages=[PipelineStage("parse", lambda number: sum(range(number * 1000)), workers=2)],
+            interface=given_interface,
+        )
+        given_profiler.start()
+        # when
+        given_pipeline.run(range(10), lambda result: True)
+        for number, ms in enumerate([10, 300, 20]):
+            given_interface.event(PageFetchedEvent(url=f"https://example.com/{number}", ms=ms))
+            given_interface.event(ArticleParsedEvent(url=f"https://example.com/{number}", ms=5))
+        given_profiler.stop()
+        report = given_profiler.get_report()
+        # then
+        assert given_profiler.stages["parse"][2] == 10
+        assert "parse:" in report
+        slowest = report.split("Slowest 2 articles")[1].split("Slowest 2 images")[0]
+        assert "https://example.com/1" in slowest.splitlines()[1]
+        assert "https://example.com/2" in slowest.splitlines()[2]
+        assert "https://example.com/0" not in slowest
+        assert os.path.isfile(tmp_path / "run.pstats")
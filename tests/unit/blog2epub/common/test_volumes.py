@@ -0,0 +1,40 @@
+import os
+import zipfile
+
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.common.volumes import save_volumes, split_into_volumes
+from blog2epub.models.configuration import ConfigurationModel
+
+
+class TestVolumes:
+    def test_split_into_volumes_by_articles_count(self, given_book_data):
+        # when
+        volumes = split_into_volumes(given_book_data.articles, given_book_data, "articles", 2)
+        # then
+        assert [len(volume) for volume in volumes] == [2, 1]
+
+    def test_split_into_volumes_by_month(self, given_book_data):
+        # given
+        given_book_data.articles[2].date = given_book_data.articles[2].date.replace(month=2)
+        # when
+        volumes = split_into_volumes(given_book_data.articles, given_book_data, "month")
+        # then
+        assert [[article.title for article in volume] for volume in volumes] == [
+            ["Article 1", "Article 2"],
+            ["Article 3"],
+        ]
+
+    def test_save_volumes_writes_only_referenced_images(self, given_book_data, tmp_path):
+        # given
+        given_configuration = ConfigurationModel(
+            destination_folder=str(tmp_path), volume_split="articles", volume_size=2
+        )
+        # when
+        books = save_volumes(given_book_data, given_configuration, EmptyInterface(), destination_folder=str(tmp_path))
+        # then
+        assert len(books) == 2
+        assert "_vol01_" in os.path.basename(books[0].file_full_path)
+        assert "_vol02_" in os.path.basename(books[1].file_full_path)
+        for book, images_count in zip(books, [2, 1], strict=True):
+            with zipfile.ZipFile(book.file_full_path) as epub:
+                assert len([name for name in epub.namelist() if name.startswith("EPUB/images/")]) == images_count
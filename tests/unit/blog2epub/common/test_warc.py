@@ -0,0 +1,67 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from blog2epub.common.throttle import ThrottledSession
+from blog2epub.common.warc import WarcArchive, WarcReplaySession, WarcWriter
+
+
+class GivenHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/old":
+            self.send_response(301)
+            self.send_header("Location", "/page?id=1")
+            self.end_headers()
+            return
+        body = f"<html><body>{self.path}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("X-Given", "yes")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestWarc:
+    def test_replay_serves_recorded_responses_without_network(self, tmp_path):
+        # given
+        given_warc = str(tmp_path / "crawl.warc.gz")
+        server = ThreadingHTTPServer(("127.0.0.1", 0), GivenHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        given_url = f"http://127.0.0.1:{server.server_address[1]}"
+        recording_session = ThrottledSession(recorder=WarcWriter(given_warc))
+        recorded = [recording_session.get(f"{given_url}/page?id={number}") for number in range(3)]
+        recorded_redirect = recording_session.get(f"{given_url}/old")
+        server.shutdown()
+        server.server_close()
+        # when
+        replay_session = WarcReplaySession(WarcArchive(given_warc))
+        replayed = [replay_session.get(f"{given_url}/page?id={number}") for number in range(3)]
+        replayed_redirect = replay_session.get(f"{given_url}/old")
+        not_recorded = replay_session.get(f"{given_url}/other")
+        # then
+        for recorded_response, replayed_response in zip(recorded, replayed, strict=True):
+            assert replayed_response.status_code == 200
+            assert replayed_response.content == recorded_response.content
+            assert replayed_response.headers["X-Given"] == "yes"
+            assert replayed_response.text == recorded_response.text
+        assert replayed_redirect.content == recorded_redirect.content == recorded[1].content
+        assert [response.status_code for response in replayed_redirect.history] == [301]
+        assert not_recorded.status_code == 404
+        assert replay_session.requests_count == 5
+
+    def test_request_block_is_text_for_bytes_method_and_url(self):
+        # given
+        given_request = requests.Request("POST", "http://example.com/form?a=1", data=b"x=1").prepare()
+        given_request.method = b"POST"
+        given_request.url = b"http://example.com/form?a=1"
+        # when
+        block = WarcWriter._get_request_block(given_request)
+        # then
+        assert block.startswith(b"POST /form?a=1 HTTP/1.1\r\nHost: example.com\r\n")
+        assert block.endswith(b"\r\n\r\nx=1")
+        assert b"b'" not in block
@@ -4,8 +4,12 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.crawlers.article_factory.default import DefaultArticleFactory
 from blog2epub.crawlers.default import DefaultCrawler
+from blog2epub.models.book import ArticleModel
+from blog2epub.models.checkpoint import CrawlStateModel
 from blog2epub.models.configuration import ConfigurationModel
+from blog2epub.models.content_patterns import Pattern
 
 
 @pytest.fixture()
@@ -30,7 +34,13 @@ def mocked_requests_get(*args, **kwargs):
                 return content
             return None
 
+        @property
+        def text(self):
+            return self.content.decode("utf-8") if self.content else ""
+
     if args and len(args) > 0:
+        if args[0].endswith("/robots.txt"):
+            return MockResponse(None, 404)
         fname = args[0].replace("http://", "").replace("https://", "").replace("/", "_")
         if fname.find(".xml?page=") != -1:
             fname = fname.replace(".xml?page=", "") + ".xml"
@@ -40,29 +50,32 @@ def mocked_requests_get(*args, **kwargs):
 
 
 class TestDefaultCrawler:
-    @patch(
-        "urllib.robotparser.RobotFileParser",
-        MagicMock(return_value=MagicMock(sitemaps=["https://bohdan.bobrowski.com.pl/wp-sitemap.xml"])),
-    )
     def test_get_sitemap_url(self, mock_configuration):
         # Given
         with open("tests/unit/blog2epub/crawlers/data/robots-1.txt") as f:
-            f.read()
+            given_robots = f.read()
         given_crawler = DefaultCrawler(
-            url="bohdan.bobrowski.com.pl",
+            url="starybezpiek.blogspot.com",
             configuration=mock_configuration,
             interface=EmptyInterface(),
         )
+        given_crawler.downloader.session.limiter = MagicMock()
         # When
-        result = given_crawler._get_sitemap_url()
+        with patch("requests.Session.request", MagicMock(return_value=MagicMock(status_code=200, text=given_robots))):
+            result = given_crawler._get_sitemap_url()
         # Then
-        assert result == "https://bohdan.bobrowski.com.pl/wp-sitemap.xml"
+        assert result == "https://starybezpiek.blogspot.com/sitemap.xml"
+        # robots.txt is requested with session, so connection limits apply and it's counted
+        given_crawler.downloader.session.limiter.limit.assert_called_once_with(
+            "https://starybezpiek.blogspot.com/robots.txt"
+        )
+        assert given_crawler.downloader.session.requests_count == 1
 
     @patch(
         "urllib.robotparser.RobotFileParser",
         MagicMock(return_value=MagicMock(sitemaps=["https://bohdan.bobrowski.com.pl/wp-sitemap.xml"])),
     )
-    @patch("requests.get", MagicMock(side_effect=mocked_requests_get))
+    @patch("requests.Session.get", MagicMock(side_effect=mocked_requests_get))
     def test_get_pages_urls(self, mock_configuration):
         # given
         given_crawler = DefaultCrawler(
@@ -86,7 +99,7 @@ class TestDefaultCrawler:
         "urllib.robotparser.RobotFileParser",
         MagicMock(return_value=MagicMock(sitemaps=["https://rocket-garage.blogspot.com/sitemap.xml"])),
     )
-    @patch("requests.get", MagicMock(side_effect=mocked_requests_get))
+    @patch("requests.Session.get", MagicMock(side_effect=mocked_requests_get))
     def test_rocket_garage_blogspot_com(self, mock_configuration):
         # given
         given_crawler = DefaultCrawler(
@@ -99,3 +112,57 @@ class TestDefaultCrawler:
         pages = given_crawler._get_pages_urls(sitemap_url=sitemap_url)
         # then
         assert len(pages) > 1000
+
+    def test_crawl_resumes_from_checkpoint(self, tmp_path):
+        # given
+        given_pages = [f"https://example.com/article_{number}.html" for number in range(1, 4)]
+        given_crawler = DefaultCrawler(
+            url="example.com",
+            interface=EmptyInterface(),
+            configuration=ConfigurationModel(destination_folder=str(tmp_path), limit="", resume=True),
+            cache_folder=str(tmp_path),
+        )
+        given_crawler.checkpoint.save_state(
+            CrawlStateModel(url=given_crawler.url, pages=given_pages, title="Example blog", language="en")
+        )
+        for page_url in given_pages[:2]:
+            given_crawler.checkpoint.add_article(
+                ArticleModel(url=page_url, title=page_url, date=None, content="<p>content</p>", comments="")
+            )
+        with open(given_crawler.checkpoint.articles_path, "a") as f:
+            f.write('{"url": "https://example.com/article_3.html", "ti')
+        given_crawler._fetch_page = MagicMock(return_value=None)
+        # when
+        given_crawler.crawl()
+        # then
+        assert given_crawler.title == "Example blog"
+        assert [article.url for article in given_crawler.articles] == given_pages[:2]
+        given_crawler._fetch_page.assert_called_once_with(given_pages[2])
+
+    def test_parse_page_uses_cached_article_until_patterns_change(self, tmp_path):
+        # given
+        given_page = ("https://example.com/article.html", b"<html><body><p>content</p></body></html>")
+        given_crawler = DefaultCrawler(
+            url="example.com",
+            interface=EmptyInterface(),
+            configuration=ConfigurationModel(destination_folder=str(tmp_path), limit=""),
+            cache_folder=str(tmp_path),
+        )
+        given_article = ArticleModel(
+            url=given_page[0], title="Article", date=None, content="<p>content</p>", comments=""
+        )
+        process = MagicMock(return_value=given_article)
+
+        class GivenArticleFactory(DefaultArticleFactory):
+            def process(self):
+                return process()
+
+        given_crawler.article_factory_class = GivenArticleFactory
+        # when
+        first_article = given_crawler._parse_page(given_page)
+        cached_article = given_crawler._parse_page(given_page)
+        given_crawler.patterns.content.append(Pattern(xpath="//main"))
+        reparsed_article = given_crawler._parse_page(given_page)
+        # then
+        assert first_article == cached_article == reparsed_article == given_article
+        assert process.call_count == 2
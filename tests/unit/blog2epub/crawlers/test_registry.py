@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock
+
+from blog2epub.crawlers.registry import ENGINES, EngineRegistry, get_generator
+
+
+class TestEngineRegistry:
+    def test_resolve_by_url_patterns_without_probe(self):
+        # given
+        given_fetch = MagicMock()
+        # when
+        results = [
+            ENGINES.resolve("https://example.blogspot.com", fetch=given_fetch),
+            ENGINES.resolve("https://example.wordpress.com", fetch=given_fetch),
+            ENGINES.resolve("https://nrdblog.cmosnet.eu", fetch=given_fetch),
+            ENGINES.resolve("https://example.blogspot.com", engine="wordpress", fetch=given_fetch),
+        ]
+        # then
+        assert results == ["blogger", "wordpress", "nrdblog_cmosnet", "wordpress"]
+        given_fetch.assert_not_called()
+
+    def test_resolve_by_generator_probes_homepage_once(self):
+        # given
+        given_registry = EngineRegistry()
+        given_registry.register("default", "blog2epub.crawlers.default.DefaultCrawler")
+        given_registry.register(
+            "wordpress", "blog2epub.crawlers.wordpress.WordpressCrawler", generator_patterns=["^wordpress"]
+        )
+        given_fetch = MagicMock(return_value=b'<html><head><meta content="WordPress 6.4.2" name="generator" /></head>')
+        # when
+        first = given_registry.resolve("https://example.com", fetch=given_fetch)
+        second = given_registry.resolve("https://example.com", fetch=given_fetch)
+        other = given_registry.resolve("https://other.com", fetch=MagicMock(return_value=None))
+        # then
+        assert first == second == "wordpress"
+        assert other == "default"
+        given_fetch.assert_called_once_with("https://example.com")
+        assert given_registry["wordpress"].__name__ == "WordpressCrawler"
+
+    def test_get_generator(self):
+        # when
+        blogger = get_generator(b"<head><meta name='generator' content='blogger'/></head>")
+        missing = get_generator(b"<head><meta name='description' content='blog'/></head>")
+        # then
+        assert blogger == "blogger"
+        assert missing is None
@@ -0,0 +1,76 @@
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from blog2epub.blog2epub_main import Blog2Epub
+from blog2epub.common.downloader import Downloader
+from blog2epub.common.interfaces import EmptyInterface
+from blog2epub.crawlers.wordpress import WordpressCrawler
+from blog2epub.models.book import ArticleModel
+from blog2epub.models.configuration import ConfigurationModel
+
+
+def _given_blog2epub(tmp_path, pages: list[str]) -> Blog2Epub:
+    blog2epub = Blog2Epub(
+        url="example.com",
+        configuration=ConfigurationModel(
+            destination_folder=str(tmp_path), limit="", engine="default", engine_probe=False
+        ),
+        interface=EmptyInterface(),
+        cache_folder=str(tmp_path),
+    )
+    # stages of the crawl are replaced with mocks
+    crawler: Any = blog2epub.crawler
+    crawler._discover_pages = MagicMock(return_value=pages)
+    crawler._fetch_page = MagicMock(side_effect=lambda page_url: (page_url, b""))
+    crawler._parse_page = MagicMock(
+        side_effect=lambda page: ArticleModel(url=page[0], title=page[0], date=None, content="<p>x</p>", comments="")
+    )
+    return blog2epub
+
+
+class TestBlog2Epub:
+    def test_iter_articles_yields_articles_in_order(self, tmp_path):
+        # given
+        given_pages = [f"https://example.com/article_{number}.html" for number in range(5)]
+        given_blog2epub = _given_blog2epub(tmp_path, given_pages)
+        # when
+        result = [crawled.article.url for crawled in given_blog2epub.iter_articles(queue_size=1)]
+        # then
+        assert result == given_pages
+        assert given_blog2epub.crawler.on_article is None
+
+    def test_iter_articles_cancels_crawl_when_closed(self, tmp_path):
+        # given
+        given_pages = [f"https://example.com/article_{number}.html" for number in range(100)]
+        given_blog2epub = _given_blog2epub(tmp_path, given_pages)
+        # when
+        for crawled in given_blog2epub.iter_articles(queue_size=1):
+            if crawled.article.url == given_pages[2]:
+                break
+        # then
+        assert given_blog2epub.crawler.cancelled
+        assert not given_blog2epub.crawler.active
+        assert len(given_blog2epub.crawler.articles) < len(given_pages)
+
+    def test_crawler_is_resolved_from_probed_homepage_with_one_downloader(self, tmp_path):
+        # given
+        given_homepage = b'<html><head><meta name="generator" content="WordPress 6.4.2"/><title>Blog</title></head>'
+        given_session = MagicMock()
+        given_session.get.return_value = MagicMock(status_code=200, content=given_homepage)
+        # when
+        with (
+            patch("blog2epub.common.warc.get_session", MagicMock(return_value=given_session)),
+            patch("blog2epub.crawlers.abstract.Downloader", MagicMock(wraps=Downloader)) as downloader_class,
+        ):
+            given_blog2epub = Blog2Epub(
+                url="probed-blog.example.com",
+                configuration=ConfigurationModel(destination_folder=str(tmp_path), limit=""),
+                interface=EmptyInterface(),
+                cache_folder=str(tmp_path),
+            )
+        # then
+        crawler = given_blog2epub.crawler
+        assert isinstance(crawler, WordpressCrawler)
+        assert downloader_class.call_count == 1
+        given_session.get.assert_called_once()
+        assert crawler.downloader.get_content(crawler.url) == given_homepage
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+import pytest
+
+from blog2epub.blog2epub_cli import get_parser
+
+
+class TestBlog2EpubCli:
+    def test_import_does_not_load_heavy_libraries(self):
+        # given
+        given_script = (
+            "import sys\n"
+            "import blog2epub.blog2epub_cli\n"
+            "from blog2epub import Blog2Epub\n"
+            "assert 'wordpress' in Blog2Epub.ENGINES_MAP\n"
+            "heavy = ['lxml', 'ebooklib', 'PIL', 'requests', 'bs4', 'pydantic', 'blog2epub.crawlers.default']\n"
+            "print(','.join(name for name in heavy if name in sys.modules))\n"
+        )
+        # when
+        result = subprocess.run([sys.executable, "-c", given_script], capture_output=True, text=True, check=True)
+        # then
+        assert result.stdout.strip() == ""
+
+    def test_parser_accepts_bare_url(self):
+        # when
+        args = get_parser().parse_args(["https://example.blogspot.com"])
+        # then
+        assert args.url == "https://example.blogspot.com"
+        assert args.volumes is None
+        assert args.engine == "default"
+
+    def test_parser_rejects_unknown_volumes_split(self):
+        # when
+        with pytest.raises(SystemExit):
+            get_parser().parse_args(["https://example.blogspot.com", "--volumes", "chapters"])
+
+    def test_profile_flag_does_not_take_url(self):
+        # when
+        args = get_parser().parse_args(["--profile", "https://example.blogspot.com"])
+        # then
+        assert args.profile
+        assert args.url == "https://example.blogspot.com"
+        assert args.profile_output == "./downloads/blog2epub.pstats"